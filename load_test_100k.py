@@ -5,15 +5,27 @@
 - 10万个并发OCR请求
 - 详细的性能指标统计
 - 错误分析和成功率计算
+
+测试图像只在启动时下载一次，之后以 image_base64 的形式随每个请求发送，
+使测试衡量的是OCR服务本身，而不是服务端重复下载远程图像的开销。
 """
 import asyncio
+import base64
 import logging
+import math
 import time
-from collections import defaultdict
+from collections import Counter
 from dataclasses import dataclass, field
-from typing import Dict, List
+from functools import lru_cache
+from typing import Dict
 
 import httpx
+import numpy as np
+
+try:
+    import uvloop
+except ImportError:  # pragma: no cover - uvloop为可选依赖
+    uvloop = None
 
 logging.basicConfig(
     level=logging.INFO,
@@ -21,8 +33,27 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+_ERROR_NAMES: Dict[type, str] = {
+    httpx.TimeoutException: "Timeout",
+    httpx.ConnectError: "Connection Error: ConnectError",
+}
+
+
+@lru_cache(maxsize=None)
+def _error_name(exc_type: type) -> str:
+    """返回异常类型在错误分布中的名称，每种异常类型只解析一次。
+
+    参数:
+        exc_type: 请求过程中抛出的异常类型
+    """
+    for base in exc_type.__mro__:
+        name = _ERROR_NAMES.get(base)
+        if name is not None:
+            return name
+    return f"Exception: {exc_type.__name__}"
+
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class LoadTestResult:
     """单个请求的测试结果。"""
 
@@ -33,9 +64,46 @@ class LoadTestResult:
     error: str | None = None
 
 
-@dataclass
+@dataclass(slots=True)
+class LatencyHistogram:
+    """按对数分桶的响应时间直方图。
+
+    以固定大小的计数数组在线累积响应时间，内存占用与请求数无关；
+    分位数按桶上界估算，相对误差不超过 growth - 1（默认约1%）。
+    """
+
+    min_ms: float = 0.01
+    max_ms: float = 3_600_000.0
+    growth: float = 1.01
+    counts: np.ndarray = field(init=False, repr=False)
+    _log_growth: float = field(init=False, repr=False)
+
+    def __post_init__(self):
+        self._log_growth = math.log(self.growth)
+        bucket_count = math.ceil(math.log(self.max_ms / self.min_ms) / self._log_growth) + 2
+        self.counts = np.zeros(bucket_count, dtype=np.int64)
+
+    def add(self, value_ms: float):
+        """记录一个响应时间样本。"""
+        if value_ms <= self.min_ms:
+            index = 0
+        else:
+            index = int(math.log(value_ms / self.min_ms) / self._log_growth) + 1
+        self.counts[min(index, len(self.counts) - 1)] += 1
+
+    def value_at_rank(self, rank: int) -> float:
+        """返回第 rank 个（从0开始）最小样本所在桶的上界。"""
+        index = int(np.searchsorted(np.cumsum(self.counts), rank + 1))
+        return self.min_ms * self.growth**index
+
+
+@dataclass(slots=True)
 class LoadTestStats:
-    """负载测试的统计信息。"""
+    """负载测试的统计信息。
+
+    每个请求完成时通过 record 在线累积，结束后调用 finalize 计算派生指标，
+    整个过程不保留逐请求的结果。
+    """
 
     total_requests: int
     successful_requests: int = 0
@@ -48,41 +116,56 @@ class LoadTestStats:
     p95_response_time_ms: float = 0.0
     p99_response_time_ms: float = 0.0
     qps: float = 0.0
-    error_distribution: Dict[str, int] = field(default_factory=lambda: defaultdict(int))
+    error_distribution: Dict[str, int] = field(default_factory=Counter)
+    _response_time_sum_ms: float = field(default=0.0, repr=False)
+    _histogram: LatencyHistogram = field(default_factory=LatencyHistogram, repr=False)
 
-    def calculate_statistics(self, results: List[LoadTestResult]):
-        """根据测试结果计算统计指标。
+    @property
+    def completed_requests(self) -> int:
+        """已完成（无论成功与否）的请求数量。"""
+        return self.successful_requests + self.failed_requests
+
+    def record(self, result: LoadTestResult):
+        """将单个请求的结果累积到统计信息中。
 
         参数:
-            results: 所有请求的结果列表
+            result: 已完成请求的结果
         """
-        self.successful_requests = sum(1 for r in results if r.success)
-        self.failed_requests = sum(1 for r in results if not r.success)
-
-        response_times = [r.duration_ms for r in results if r.success]
-
-        if response_times:
-            self.min_response_time_ms = min(response_times)
-            self.max_response_time_ms = max(response_times)
-            self.avg_response_time_ms = sum(response_times) / len(response_times)
-
-            sorted_times = sorted(response_times)
-            n = len(sorted_times)
-            median_index = n // 2
-            percentile_95_index = int(0.95 * (n - 1)) if n > 1 else 0
-            percentile_99_index = int(0.99 * (n - 1)) if n > 1 else 0
-
-            self.median_response_time_ms = sorted_times[median_index]
-            self.p95_response_time_ms = sorted_times[percentile_95_index]
-            self.p99_response_time_ms = sorted_times[percentile_99_index]
+        if not result.success:
+            self.failed_requests += 1
+            if result.error:
+                self.error_distribution[result.error] += 1
+            return
+
+        duration_ms = result.duration_ms
+        self.successful_requests += 1
+        self._response_time_sum_ms += duration_ms
+        if duration_ms < self.min_response_time_ms:
+            self.min_response_time_ms = duration_ms
+        if duration_ms > self.max_response_time_ms:
+            self.max_response_time_ms = duration_ms
+        self._histogram.add(duration_ms)
+
+    def finalize(self):
+        """根据累积的数据计算平均值、分位数和QPS。"""
+        n = self.successful_requests
+        if n:
+            self.avg_response_time_ms = self._response_time_sum_ms / n
+
+            median, p95, p99 = (
+                min(
+                    max(self._histogram.value_at_rank(rank), self.min_response_time_ms),
+                    self.max_response_time_ms,
+                )
+                for rank in (n // 2, int(0.95 * (n - 1)), int(0.99 * (n - 1)))
+            )
+            self.median_response_time_ms = median
+            self.p95_response_time_ms = p95
+            self.p99_response_time_ms = p99
 
         if self.total_duration_seconds > 0:
             self.qps = self.total_requests / self.total_duration_seconds
 
-        for result in results:
-            if not result.success and result.error:
-                self.error_distribution[result.error] += 1
-
     def print_summary(self):
         """打印测试结果摘要。"""
         print("\n" + "=" * 80)
@@ -137,6 +220,8 @@ class LoadTester:
         self.concurrency = concurrency
         self.timeout = timeout
         self.test_image_url = "https://images.unsplash.com/photo-1546410531-bb4caa6b424d"
+        self._payload: Dict[str, str] = {}
+        self._progress_interval = 10_000
 
     async def _send_single_request(
         self, client: httpx.AsyncClient, request_id: int
@@ -150,68 +235,29 @@ class LoadTester:
         返回:
             包含请求结果的LoadTestResult对象
         """
-        start_time = time.perf_counter()
+        status_code = 0
+        error: str | None = None
+        start_ns = time.monotonic_ns()
         try:
             response = await client.post(
                 f"{self.base_url}/v1/ocr",
-                json={"image_url": self.test_image_url},
-                timeout=self.timeout,
-            )
-            duration_ms = (time.perf_counter() - start_time) * 1000
-
-            return LoadTestResult(
-                request_id=request_id,
-                status_code=response.status_code,
-                duration_ms=duration_ms,
-                success=(response.status_code == 200),
-                error=None if response.status_code == 200 else f"HTTP {response.status_code}",
-            )
-        except httpx.TimeoutException:
-            duration_ms = (time.perf_counter() - start_time) * 1000
-            return LoadTestResult(
-                request_id=request_id,
-                status_code=0,
-                duration_ms=duration_ms,
-                success=False,
-                error="Timeout",
-            )
-        except httpx.ConnectError as exc:
-            duration_ms = (time.perf_counter() - start_time) * 1000
-            return LoadTestResult(
-                request_id=request_id,
-                status_code=0,
-                duration_ms=duration_ms,
-                success=False,
-                error=f"Connection Error: {type(exc).__name__}",
+                json=self._payload,
             )
+            status_code = response.status_code
+            if status_code != 200:
+                error = f"HTTP {status_code}"
         except Exception as exc:
-            duration_ms = (time.perf_counter() - start_time) * 1000
-            return LoadTestResult(
-                request_id=request_id,
-                status_code=0,
-                duration_ms=duration_ms,
-                success=False,
-                error=f"Exception: {type(exc).__name__}",
-            )
-
-    async def _run_batch(
-        self, client: httpx.AsyncClient, start_id: int, batch_size: int
-    ) -> List[LoadTestResult]:
-        """并发执行一批请求。
-
-        参数:
-            client: HTTP客户端实例
-            start_id: 批次起始请求ID
-            batch_size: 批次大小
-
-        返回:
-            该批次所有请求的结果列表
-        """
-        tasks = [
-            self._send_single_request(client, start_id + i)
-            for i in range(batch_size)
-        ]
-        return await asyncio.gather(*tasks)
+            error = _error_name(type(exc))
+        finally:
+            duration_ms = (time.monotonic_ns() - start_ns) / 1e6
+
+        return LoadTestResult(
+            request_id=request_id,
+            status_code=status_code,
+            duration_ms=duration_ms,
+            success=(status_code == 200),
+            error=error,
+        )
 
     async def run(self) -> LoadTestStats:
         """执行完整的负载测试。
@@ -224,38 +270,45 @@ class LoadTester:
         )
 
         stats = LoadTestStats(total_requests=self.total_requests)
-        all_results: List[LoadTestResult] = []
-
-        test_start_time = time.time()
-
-        async with httpx.AsyncClient() as client:
-            num_batches = (self.total_requests + self.concurrency - 1) // self.concurrency
-            logger.info(f"将分为 {num_batches} 批次执行")
-
-            for batch_idx in range(num_batches):
-                start_id = batch_idx * self.concurrency
-                remaining = self.total_requests - start_id
-                batch_size = min(self.concurrency, remaining)
-
-                logger.info(
-                    f"执行第 {batch_idx + 1}/{num_batches} 批次 "
-                    f"(请求 {start_id + 1} - {start_id + batch_size})"
-                )
-
-                batch_results = await self._run_batch(client, start_id, batch_size)
-                all_results.extend(batch_results)
+        semaphore = asyncio.Semaphore(self.concurrency)
+        limits = httpx.Limits(
+            max_connections=self.concurrency,
+            max_keepalive_connections=self.concurrency,
+        )
 
-                success_count = sum(1 for r in batch_results if r.success)
-                logger.info(
-                    f"批次完成 - 成功: {success_count}/{batch_size}, "
-                    f"累计完成: {len(all_results)}/{self.total_requests}"
-                )
+        async with httpx.AsyncClient(
+            http2=True,
+            limits=limits,
+            timeout=httpx.Timeout(self.timeout),
+            headers={"connection": "keep-alive"},
+        ) as client:
+            image_response = await client.get(self.test_image_url)
+            image_response.raise_for_status()
+            self._payload = {
+                "image_base64": base64.b64encode(image_response.content).decode("ascii")
+            }
+
+            test_start_time = time.time()
+
+            async def bounded(request_id: int) -> LoadTestResult:
+                async with semaphore:
+                    return await self._send_single_request(client, request_id)
+
+            tasks = [bounded(i) for i in range(self.total_requests)]
+            for future in asyncio.as_completed(tasks):
+                stats.record(await future)
+                completed = stats.completed_requests
+                if completed % self._progress_interval == 0:
+                    logger.info(
+                        f"已完成 {completed:,}/{self.total_requests:,} 个请求 - "
+                        f"成功: {stats.successful_requests:,}, 失败: {stats.failed_requests:,}"
+                    )
 
         test_end_time = time.time()
         stats.total_duration_seconds = test_end_time - test_start_time
 
         logger.info("所有请求已完成，正在计算统计信息...")
-        stats.calculate_statistics(all_results)
+        stats.finalize()
 
         return stats
 
@@ -289,4 +342,6 @@ async def main():
 
 
 if __name__ == "__main__":
+    if uvloop is not None:
+        uvloop.install()
     asyncio.run(main())
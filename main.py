@@ -4,15 +4,18 @@ from __future__ import annotations
 
 import uvicorn
 
-from smart_ocr.app import app
+from smart_ocr.config import get_settings
 
 
 def run():
     """启动Uvicorn服务器并运行FastAPI应用。"""
     uvicorn.run(
-        app,
+        "smart_ocr.app:app",
         host="0.0.0.0",
         port=8000,
+        workers=get_settings().web_concurrency,
+        loop="uvloop",
+        http="httptools",
         lifespan="on",
         log_level="info",
     )
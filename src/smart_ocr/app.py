@@ -10,7 +10,7 @@ from fastapi.responses import JSONResponse
 
 from smart_ocr import __version__
 from smart_ocr.config import get_settings
-from smart_ocr.image_loader import ImageProcessingError
+from smart_ocr.image_loader import ImageProcessingError, close_http_client
 from smart_ocr.models import (
     HealthResponse,
     OCRRequest,
@@ -20,7 +20,8 @@ from smart_ocr.models import (
     TaskStatisticsResponse,
     TaskStatus,
 )
-from smart_ocr.orchestrator import OCROrchestrator
+from smart_ocr.orchestrator import OCROrchestrator, ServiceOverloadedError
+from smart_ocr.pdf_render import shutdown_render_executor
 
 logging.basicConfig(
     level=logging.INFO,
@@ -68,10 +69,13 @@ async def shutdown_event():
     在服务停止时释放所有占用的资源，包括：
     - 停止OCR编排器
     - 关闭GPU工作进程
-    - 清理临时资源
+    - 关闭共享的HTTP下载客户端
+    - 关闭PDF渲染进程池
     """
     logger.info("正在关闭 Smart OCR 服务")
     await orchestrator.stop()
+    await close_http_client()
+    shutdown_render_executor()
     logger.info("Smart OCR 服务已关闭")
 
 
@@ -125,13 +129,20 @@ async def perform_ocr(request: OCRRequest, track_progress: bool = True):
 
     异常:
         HTTPException(400): 当输入数据无效或文件处理失败时
+        HTTPException(503): 当处理中的请求数已达上限时
         HTTPException(500): 当服务内部出现未预期的错误时
     """
     try:
         result = await orchestrator.process_request(request, track_progress=track_progress)
         return result
+    except ServiceOverloadedError as exc:
+        logger.warning("请求被拒绝: %s", exc)
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(exc),
+        )
     except ImageProcessingError as exc:
-        logger.error(f"文件处理错误: {exc}")
+        logger.error("文件处理错误: %s", exc)
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=str(exc),
@@ -2,10 +2,12 @@ from __future__ import annotations
 
 """应用级配置项定义与加载逻辑。"""
 
+import os
 from functools import lru_cache
-from typing import List
+from typing import Annotated, List, Optional
 
-from pydantic import BaseSettings, Field, validator
+from pydantic import Field, field_validator
+from pydantic_settings import BaseSettings, NoDecode, SettingsConfigDict
 
 
 class Settings(BaseSettings):
@@ -17,15 +19,39 @@ class Settings(BaseSettings):
 
     app_name: str = Field(default="smart-ocr-service", description="服务实例名称")
     api_prefix: str = Field(default="/v1", description="所有API接口的统一前缀")
-    gpu_device_ids: List[int] = Field(
+    gpu_device_ids: Annotated[List[int], NoDecode] = Field(
         default_factory=lambda: [0, 1, 2],
         description="允许用于推理的GPU设备编号列表",
     )
     use_gpu: bool = Field(default=True, description="是否启用GPU模式运行PaddleOCR")
     paddle_lang: str = Field(default="ch", description="PaddleOCR使用的语言模型标识")
+    paddle_rec_batch_num: int = Field(
+        default=16,
+        description="文本识别阶段单次送入模型的文本行数量，增大可提高GPU利用率",
+    )
+    cpu_preproc_threads: int = Field(
+        default_factory=lambda: os.cpu_count() or 1,
+        description="所有GPU工作进程共享的图像解码与结果解析线程数，默认等于CPU核心数",
+    )
+    paddle_det_model_dir: Optional[str] = Field(
+        default=None,
+        description="文本检测模型目录，可指向量化（INT8）后的推理模型，未设置时使用PaddleOCR默认模型",
+    )
+    paddle_rec_model_dir: Optional[str] = Field(
+        default=None,
+        description="文本识别模型目录，可指向量化（INT8）后的推理模型，未设置时使用PaddleOCR默认模型",
+    )
+    paddle_cls_model_dir: Optional[str] = Field(
+        default=None,
+        description="方向分类模型目录，未设置时使用PaddleOCR默认模型",
+    )
+    paddle_enable_mkldnn: bool = Field(
+        default=False,
+        description="CPU模式下是否启用oneDNN（MKL-DNN）加速，INT8模型需开启才能使用量化内核",
+    )
     max_queue_size: int = Field(
         default=100_000,
-        description="请求并发队列的最大长度，防止系统过载",
+        description="同时处理中的请求数上限，超出后新请求立即被拒绝，防止系统过载",
     )
     max_workers: int = Field(
         default=32,
@@ -35,6 +61,14 @@ class Settings(BaseSettings):
         default=10.0,
         description="下载远程资源时的超时时间（秒）",
     )
+    max_file_size: int = Field(
+        default=100 * 1024 * 1024,
+        description="从URL下载的图像/PDF文件大小上限（字节），超出时拒绝请求",
+    )
+    download_cache_max_bytes: int = Field(
+        default=256 * 1024 * 1024,
+        description="按URL缓存已下载图像/PDF的总字节上限（仅缓存带ETag的响应），0表示禁用",
+    )
     request_timeout_seconds: float = Field(
         default=25.0,
         description="FastAPI 接口处理请求的整体超时时间（秒）",
@@ -43,17 +77,42 @@ class Settings(BaseSettings):
         default=220,
         description="将PDF页面渲染为图像时使用的DPI分辨率",
     )
+    pdf_render_format: str = Field(
+        default="JPEG",
+        description="pdf_ticket渲染页面时默认使用的图像格式（PNG 或 JPEG），需要无损存档时可改为 PNG",
+    )
+    pdf_max_pages_in_flight: int = Field(
+        default=16,
+        ge=1,
+        description="单个PDF请求中已渲染但尚未完成识别的页面数上限，渲染端最多再预先渲染同等数量的页面",
+    )
+    pdf_render_workers: int = Field(
+        default_factory=lambda: os.cpu_count() or 1,
+        description="PDF渲染进程池的进程数，由服务端PDF请求与pdf_ticket的并行加载共用，默认等于CPU核心数",
+    )
+    pdf_angle_cls: bool = Field(
+        default=False,
+        description="是否对PDF页面的文本行执行方向分类；渲染页面通常方向端正，扫描件存在倒置页面时再开启",
+    )
+    web_concurrency: int = Field(
+        default=1,
+        validation_alias="WEB_CONCURRENCY",
+        description=(
+            "Uvicorn工作进程数量。每个进程都会在所有配置的GPU上各加载一份PaddleOCR模型，"
+            "因此需保证 工作进程数 × GPU数量 不超出显存容量"
+        ),
+    )
 
-    class Config:
-        """Pydantic配置项，指定环境变量前缀与匹配规则。"""
-
-        env_prefix = "SMART_OCR_"
-        case_sensitive = False
+    # Pydantic配置项，指定环境变量前缀与匹配规则
+    model_config = SettingsConfigDict(env_prefix="SMART_OCR_", case_sensitive=False)
 
-    @validator("gpu_device_ids", pre=True)
+    @field_validator("gpu_device_ids", mode="before")
+    @classmethod
     def _parse_gpu_ids(cls, value: object) -> List[int]:
         """将环境变量中的GPU编号字符串解析为整数列表。"""
 
+        if isinstance(value, list) and all(type(item) is int for item in value):
+            return value
         if value is None:
             return [0, 1, 2]
         if isinstance(value, str):
@@ -5,11 +5,21 @@ from __future__ import annotations
 import asyncio
 import logging
 import time
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import asynccontextmanager
-from typing import AsyncIterator, Dict, List
+from typing import (
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Sequence,
+    Union,
+)
 
 from smart_ocr.config import Settings
-from smart_ocr.ocr_service import OCRService
+from smart_ocr.ocr_service import ImageData, OCRService
 
 logger = logging.getLogger(__name__)
 
@@ -18,7 +28,7 @@ class GPUWorkerManager:
     """跨多个GPU设备的OCR工作进程管理器。
 
     该类负责初始化和管理绑定到不同GPU设备的OCR工作进程，
-    并通过轮询（Round-Robin）算法实现请求的负载均衡。
+    并将每个请求分配给当前未完成工作量最少的工作进程，实现负载均衡。
     """
 
     def __init__(self, settings: Settings):
@@ -29,51 +39,72 @@ class GPUWorkerManager:
         """
         self.settings = settings
         self.workers: List[OCRService] = []
-        self._round_robin_index = 0
-        self._lock = asyncio.Lock()
+        self._inflight: List[int] = []
+        self._preprocess_executor: ThreadPoolExecutor | None = None
 
     async def initialize(self):
         """为配置中的每个GPU设备初始化一个OCR工作进程。
 
-        该方法会遍历配置的GPU设备ID列表，为每个设备创建独立的
-        OCRService实例，并预加载PaddleOCR模型到对应的GPU显存中。
+        该方法会为配置的每个GPU设备创建独立的OCRService实例。创建实例只会
+        建立线程池，模型在 warmup() 或首次识别时才加载。
         """
         logger.info(
-            f"正在为以下GPU设备初始化OCR工作进程: {self.settings.gpu_device_ids}"
+            "正在为以下GPU设备初始化OCR工作进程: %s", self.settings.gpu_device_ids
         )
 
-        for gpu_id in self.settings.gpu_device_ids:
-            worker = OCRService(
-                gpu_id=gpu_id,
-                lang=self.settings.paddle_lang,
-                use_gpu=self.settings.use_gpu,
-            )
-            self.workers.append(worker)
+        self._preprocess_executor = ThreadPoolExecutor(
+            max_workers=self.settings.cpu_preproc_threads,
+            thread_name_prefix="ocr-preprocess",
+        )
 
-        logger.info(f"已成功初始化 {len(self.workers)} 个GPU工作进程")
+        self.workers = [
+            self._create_worker(gpu_id) for gpu_id in self.settings.gpu_device_ids
+        ]
 
-    async def get_next_worker(self) -> OCRService:
-        """使用轮询算法获取下一个可用的OCR工作进程。
+        self._inflight = [0] * len(self.workers)
+        logger.info("已成功初始化 %d 个GPU工作进程", len(self.workers))
 
-        该方法通过异步锁保证线程安全，确保在高并发场景下
-        请求能够均匀分配到各个GPU设备上。
+    async def warmup(self):
+        """预热所有工作进程，使模型加载与首次推理在服务启动阶段完成。
 
-        返回:
-            下一个可用的OCRService工作进程实例
+        模型逐个构建，避免首次运行时多个实例同时下载、写入同一模型缓存目录；
+        构建完成后的首次推理在各GPU上并行执行。
         """
-        async with self._lock:
-            worker = self.workers[self._round_robin_index]
-            self._round_robin_index = (self._round_robin_index + 1) % len(
-                self.workers
-            )
-            return worker
+        await asyncio.gather(*(worker.warmup() for worker in self.workers))
+        logger.info("已完成 %d 个GPU工作进程的预热", len(self.workers))
+
+    def _create_worker(self, gpu_id: int) -> OCRService:
+        """创建绑定到指定GPU设备的OCR工作进程。"""
+        return OCRService(
+            gpu_id=gpu_id,
+            lang=self.settings.paddle_lang,
+            use_gpu=self.settings.use_gpu,
+            rec_batch_num=self.settings.paddle_rec_batch_num,
+            preprocess_executor=self._preprocess_executor,
+            model_dirs=self._model_dirs(),
+            enable_mkldnn=self.settings.paddle_enable_mkldnn,
+        )
+
+    def _model_dirs(self) -> Dict[str, str]:
+        """收集配置中显式指定的模型目录，未指定的模型沿用PaddleOCR默认值。"""
+        candidates = {
+            "det_model_dir": self.settings.paddle_det_model_dir,
+            "rec_model_dir": self.settings.paddle_rec_model_dir,
+            "cls_model_dir": self.settings.paddle_cls_model_dir,
+        }
+        return {key: value for key, value in candidates.items() if value}
+
+    def _least_loaded_index(self) -> int:
+        """返回当前未完成工作量最少的工作进程下标。"""
+        return min(range(len(self._inflight)), key=self._inflight.__getitem__)
 
     @asynccontextmanager
     async def get_worker(self) -> AsyncIterator[OCRService]:
         """上下文管理器，用于获取和释放OCR工作进程。
 
-        该方法提供了一种安全的方式来获取工作进程，确保资源在使用后
-        能够正确释放（虽然当前实现中没有显式的释放操作）。
+        进入时选择未完成图像数最少的工作进程并为其计数加一，退出时减一。
+        PDF的每一页都单独获取工作进程，因此请求大小差异较大（单张图像与多页PDF）
+        时也不会出现某个GPU排队而其他GPU空闲。计数只在事件循环线程中读写，无需加锁。
 
         使用示例:
             async with gpu_manager.get_worker() as worker:
@@ -82,20 +113,24 @@ class GPUWorkerManager:
         生成:
             OCRService实例，可用于执行OCR识别任务
         """
-        worker = await self.get_next_worker()
+        index = self._least_loaded_index()
+        self._inflight[index] += 1
         try:
-            yield worker
+            yield self.workers[index]
         finally:
-            pass
+            self._inflight[index] -= 1
 
-    async def process_ocr_request(self, image_data: bytes) -> Dict:
+    async def process_ocr_request(
+        self, image_data: ImageData, cls: bool = True
+    ) -> Dict:
         """处理单个OCR请求，自动选择最优的GPU工作进程。
 
         该方法会自动选择一个可用的GPU工作进程，执行OCR识别，
         并记录处理时间等性能指标。
 
         参数:
-            image_data: 待识别的图像二进制数据
+            image_data: 待识别的图像二进制数据，或已解码的RGB像素数组
+            cls: 是否执行文本行方向分类
 
         返回:
             包含识别结果和性能指标的字典:
@@ -103,12 +138,12 @@ class GPUWorkerManager:
             - processing_time: OCR推理耗时（秒）
             - text_count: 识别到的文本区域数量
         """
-        start_time = time.time()
+        start_time = time.perf_counter()
 
         async with self.get_worker() as worker:
-            results = await worker.recognize_image(image_data)
+            results = await worker.recognize_image(image_data, cls=cls)
 
-        processing_time = time.time() - start_time
+        processing_time = time.perf_counter() - start_time
 
         return {
             "results": results,
@@ -116,6 +151,67 @@ class GPUWorkerManager:
             "text_count": len(results),
         }
 
+    async def process_ocr_batch(
+        self,
+        pages: Union[Sequence[ImageData], AsyncIterator[ImageData]],
+        on_page_done: Optional[Callable[[int], Awaitable[None]]] = None,
+        cls: bool = True,
+    ) -> List[Dict]:
+        """并发识别多张图像（例如PDF的各个页面），将它们分散到所有GPU上。
+
+        每一页都作为独立的请求提交，由负载最低的工作进程处理，因此在K个GPU上
+        识别N页的耗时约为 ⌈N/K⌉ 页，而不是N页。页面可以是边渲染边产出的异步
+        迭代器；同时处于识别中的页面数不超过 pdf_max_pages_in_flight，达到上限
+        时暂停读取后续页面，使渲染端驻留的页面数保持有界。任意一页失败时会
+        取消其余页面。
+
+        参数:
+            pages: 待识别的图像序列，或按顺序产出图像的异步迭代器
+            on_page_done: 可选的异步回调，每完成一页调用一次，参数为已完成的页数
+            cls: 是否执行文本行方向分类
+
+        返回:
+            与输入顺序一致的识别结果列表，每个元素的格式同 process_ocr_request
+        """
+        window = asyncio.Semaphore(self.settings.pdf_max_pages_in_flight)
+        tasks: List[asyncio.Task] = []
+        completed = 0
+        failed = False
+
+        async def recognize(page: ImageData) -> Dict:
+            nonlocal completed, failed
+            try:
+                result = await self.process_ocr_request(page, cls=cls)
+            except Exception:
+                failed = True
+                raise
+            finally:
+                window.release()
+            completed += 1
+            if on_page_done is not None:
+                await on_page_done(completed)
+            return result
+
+        stream = pages if isinstance(pages, AsyncIterator) else _iterate(pages)
+        try:
+            while True:
+                await window.acquire()
+                if failed:
+                    break
+                try:
+                    page = await anext(stream)
+                except StopAsyncIteration:
+                    break
+                tasks.append(asyncio.create_task(recognize(page)))
+            return list(await asyncio.gather(*tasks))
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            raise
+        finally:
+            # 提前结束时关闭页面迭代器，使其取消尚未开始的渲染并释放资源
+            await stream.aclose()
+
     async def shutdown(self):
         """关闭所有GPU工作进程并清理相关资源。
 
@@ -126,9 +222,19 @@ class GPUWorkerManager:
         for worker in self.workers:
             worker.shutdown()
         self.workers.clear()
+        self._inflight.clear()
+        if self._preprocess_executor is not None:
+            self._preprocess_executor.shutdown(wait=True)
+            self._preprocess_executor = None
         logger.info("GPU工作进程管理器已关闭")
 
 
+async def _iterate(pages: Sequence[ImageData]) -> AsyncIterator[ImageData]:
+    """将图像序列包装为异步迭代器。"""
+    for page in pages:
+        yield page
+
+
 _manager_instance: GPUWorkerManager | None = None
 
 
@@ -2,17 +2,75 @@ from __future__ import annotations
 
 """负责加载和预处理待识别文件（图像或PDF）的工具函数。"""
 
-import base64
-from typing import List, Optional, Tuple
+import asyncio
+import binascii
+import os
+import threading
+from binascii import a2b_base64
+from collections import OrderedDict, deque
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import suppress
+from functools import lru_cache
+from typing import (
+    AsyncIterator,
+    Deque,
+    Dict,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
 
-import fitz
 import httpx
+import numpy as np
+
+from smart_ocr.config import get_settings
+from smart_ocr.pdf_render import (
+    discard_broken_executor,
+    get_fitz,
+    get_render_executor,
+    matrix_for_dpi,
+    render_workers,
+    write_temp_pdf,
+)
+
+
+_PDF_RENDER_CHUNK_PAGES = 4
+_BASE64_OFFLOAD_THRESHOLD = 256 * 1024
+# PyMuPDF不是线程安全的，服务进程内在线程池中统计页数时逐个调用
+_PAGE_COUNT_LOCK = threading.Lock()
+
+
+# 待识别的页面：单张图像为编码字节列表，PDF为逐页产出RGB数组的异步迭代器
+PageSource = Union[List[bytes], AsyncIterator[np.ndarray]]
 
 
 class ImageProcessingError(Exception):
     """图像或文档处理过程中的自定义异常类。"""
 
 
+@lru_cache(maxsize=1)
+def _get_http_client() -> httpx.AsyncClient:
+    """返回进程内共享的HTTP客户端。
+
+    所有远程图像和PDF的下载复用同一个连接池，避免每个请求都重新建立
+    TLS上下文和TCP连接。超时时间由调用方在每次请求时单独指定。
+    """
+
+    return httpx.AsyncClient(
+        limits=httpx.Limits(max_connections=256, max_keepalive_connections=128),
+        http2=True,
+    )
+
+
+async def close_http_client() -> None:
+    """关闭共享的HTTP客户端并释放连接池，应在服务关闭时调用。"""
+
+    if _get_http_client.cache_info().currsize:
+        await _get_http_client().aclose()
+        _get_http_client.cache_clear()
+
+
 async def load_image_from_request(
     image_url: Optional[str],
     image_base64: Optional[str],
@@ -20,11 +78,12 @@ async def load_image_from_request(
     pdf_base64: Optional[str],
     timeout: float,
     pdf_dpi: int = 220,
-) -> Tuple[List[bytes], bool, int]:
-    """从请求参数中加载图像或PDF文件，并返回图像列表。
+) -> Tuple[PageSource, bool, int]:
+    """从请求参数中加载图像或PDF文件，并返回待识别的页面。
 
-    该函数支持从URL或Base64字符串加载图像或PDF，并将结果统一转换为
-    图像字节数据列表，以便后续进行OCR处理。
+    该函数支持从URL或Base64字符串加载图像或PDF，以便后续进行OCR处理。
+    图像文件保持原始编码字节，PDF页面则以渲染后的RGB像素数组形式边渲染
+    边产出，省去一次PNG编码和解码。
 
     参数:
         image_url: 图像文件的URL地址
@@ -36,7 +95,8 @@ async def load_image_from_request(
 
     返回:
         元组包含三个元素:
-        - List[bytes]: 图像字节列表（对于单张图像只有一个元素，PDF会有多个）
+        - PageSource: 单张图像为只含一个编码字节元素的列表；PDF为按页码顺序
+          产出形状为 (height, width, 3) 的uint8数组的异步迭代器
         - bool: 是否为PDF文件
         - int: 总页数/图像数量
 
@@ -45,33 +105,185 @@ async def load_image_from_request(
     """
     if pdf_url or pdf_base64:
         pdf_data = await _load_pdf_data(pdf_url, pdf_base64, timeout)
-        return _convert_pdf_to_images(pdf_data, pdf_dpi)
+        return await _convert_pdf_to_images(pdf_data, pdf_dpi)
 
     if image_base64:
         try:
-            image_bytes = base64.b64decode(image_base64)
+            image_bytes = await _decode_base64(image_base64)
             return [image_bytes], False, 1
-        except Exception as exc:
+        except (binascii.Error, ValueError) as exc:
             raise ImageProcessingError(
                 f"解码Base64图像数据失败: {exc}"
             ) from exc
 
     if image_url:
         try:
-            async with httpx.AsyncClient(timeout=timeout) as client:
-                response = await client.get(image_url)
-                response.raise_for_status()
-                return [response.content], False, 1
+            return [await _download(image_url, timeout)], False, 1
         except httpx.HTTPStatusError as exc:
             raise ImageProcessingError(
                 f"下载图像失败 (HTTP {exc.response.status_code}): {exc}"
             ) from exc
-        except Exception as exc:
+        except (httpx.HTTPError, httpx.InvalidURL) as exc:
             raise ImageProcessingError(f"从URL加载图像时出错: {exc}") from exc
 
     raise ImageProcessingError("必须提供至少一种有效的输入数据来源")
 
 
+async def _decode_base64(data: str) -> bytes:
+    """解码标准字母表的Base64字符串。
+
+    直接调用C实现的 binascii.a2b_base64；超过阈值的大负载放到线程池中解码，
+    避免阻塞事件循环。
+
+    参数:
+        data: Base64编码的字符串
+
+    返回:
+        解码后的二进制数据
+    """
+    if len(data) > _BASE64_OFFLOAD_THRESHOLD:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, a2b_base64, data)
+    return a2b_base64(data)
+
+
+class _DownloadCache:
+    """按URL缓存已下载资源的LRU缓存，容量以总字节数计。
+
+    只缓存带有 ETag 的响应：命中时仍会发送 If-None-Match 条件请求，服务端
+    返回304时直接复用缓存内容，从而避免返回过期数据。同一URL的并发下载
+    会合并为一次（single-flight），防止重试风暴时重复拉取。
+    """
+
+    def __init__(self, max_bytes: int):
+        """初始化下载缓存。
+
+        参数:
+            max_bytes: 缓存内容的总字节上限，为0时不缓存任何内容
+        """
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[str, Tuple[str, bytes]] = OrderedDict()
+        self._size = 0
+        self._inflight: Dict[str, asyncio.Task] = {}
+
+    async def get(self, url: str, timeout: float) -> bytes:
+        """获取URL对应的资源内容，必要时发起下载。
+
+        参数:
+            url: 资源的URL地址
+            timeout: 下载超时时间（秒）
+
+        返回:
+            资源的二进制数据
+        """
+        task = self._inflight.get(url)
+        if task is None:
+            task = asyncio.ensure_future(self._fetch(url, timeout))
+            self._inflight[url] = task
+            task.add_done_callback(lambda _: self._inflight.pop(url, None))
+        return await asyncio.shield(task)
+
+    async def _fetch(self, url: str, timeout: float) -> bytes:
+        """下载资源，若已有缓存则进行条件请求校验。"""
+        cached = self._entries.get(url)
+        headers = {"If-None-Match": cached[0]} if cached else None
+
+        async with _get_http_client().stream(
+            "GET", url, headers=headers, timeout=timeout
+        ) as response:
+            if cached and response.status_code == 304:
+                # 等待响应期间条目可能已被淘汰，因此使用请求前取到的内容，
+                # 并重新写入缓存（同时将其移到LRU末尾）
+                etag, data = cached
+            else:
+                response.raise_for_status()
+                data = await _read_body(response)
+                etag = response.headers.get("etag")
+
+        self._store(url, etag, data)
+        return data
+
+    def _store(self, url: str, etag: Optional[str], data: bytes) -> None:
+        """写入缓存条目并按LRU顺序淘汰，直到总大小不超过上限。"""
+        previous = self._entries.pop(url, None)
+        if previous is not None:
+            self._size -= len(previous[1])
+
+        if not etag or len(data) > self.max_bytes:
+            return
+
+        self._entries[url] = (etag, data)
+        self._size += len(data)
+        while self._size > self.max_bytes:
+            _, (_, evicted) = self._entries.popitem(last=False)
+            self._size -= len(evicted)
+
+
+@lru_cache(maxsize=1)
+def _get_download_cache() -> _DownloadCache:
+    """返回进程内共享的下载缓存，容量取自配置项 download_cache_max_bytes。"""
+
+    return _DownloadCache(get_settings().download_cache_max_bytes)
+
+
+async def _download(url: str, timeout: float) -> bytes:
+    """下载远程资源，优先复用按URL缓存的内容。
+
+    参数:
+        url: 资源的URL地址
+        timeout: 下载超时时间（秒）
+
+    返回:
+        响应体的二进制数据
+
+    异常:
+        httpx.HTTPStatusError: 当服务器返回错误状态码时抛出
+    """
+    return await _get_download_cache().get(url, timeout)
+
+
+async def _read_body(response: httpx.Response) -> bytes:
+    """以流式方式读取响应体。
+
+    当响应携带有效的 Content-Length 且未经压缩时，按该长度一次性分配缓冲区
+    并逐块写入，避免拼接响应体时的反复扩容与复制；否则随读取逐块扩展缓冲区。
+    声明长度或实际读取的长度超过 max_file_size 时立即中止下载。
+
+    异常:
+        ImageProcessingError: 当响应体超过大小上限时抛出
+    """
+    limit = get_settings().max_file_size
+    expected = _content_length(response)
+    if expected is not None and expected > limit:
+        raise ImageProcessingError(f"下载的文件大小 {expected} 字节超过上限 {limit} 字节")
+
+    buffer = bytearray(expected or 0)
+    offset = 0
+    async for chunk in response.aiter_bytes(65536):
+        end = offset + len(chunk)
+        if end > limit:
+            raise ImageProcessingError(f"下载的文件大小超过上限 {limit} 字节")
+        buffer[offset:end] = chunk
+        offset = end
+
+    return bytes(memoryview(buffer)[:offset])
+
+
+def _content_length(response: httpx.Response) -> Optional[int]:
+    """返回可用于预分配缓冲区的响应体长度。
+
+    响应体经过压缩（此时头部给出的是压缩后的长度），或 Content-Length
+    缺失、不是非负整数时返回None。
+    """
+    if "content-encoding" in response.headers:
+        return None
+    try:
+        length = int(response.headers["content-length"])
+    except (KeyError, ValueError):
+        return None
+    return length if length >= 0 else None
+
+
 async def _load_pdf_data(
     pdf_url: Optional[str],
     pdf_base64: Optional[str],
@@ -92,33 +304,78 @@ async def _load_pdf_data(
     """
     if pdf_base64:
         try:
-            return base64.b64decode(pdf_base64)
-        except Exception as exc:
+            return await _decode_base64(pdf_base64)
+        except (binascii.Error, ValueError) as exc:
             raise ImageProcessingError(f"解码Base64 PDF数据失败: {exc}") from exc
 
     if pdf_url:
         try:
-            async with httpx.AsyncClient(timeout=timeout) as client:
-                response = await client.get(pdf_url)
-                response.raise_for_status()
-                return response.content
+            return await _download(pdf_url, timeout)
         except httpx.HTTPStatusError as exc:
             raise ImageProcessingError(
                 f"下载PDF失败 (HTTP {exc.response.status_code}): {exc}"
             ) from exc
-        except Exception as exc:
+        except (httpx.HTTPError, httpx.InvalidURL) as exc:
             raise ImageProcessingError(f"从URL加载PDF时出错: {exc}") from exc
 
     raise ImageProcessingError("未提供有效的PDF数据来源")
 
 
-def _convert_pdf_to_images(
+def _count_pdf_pages(pdf_data: bytes) -> int:
+    """解析PDF并返回其页数。
+
+    打开文档只解析交叉引用表，不渲染任何页面，因此在服务进程中执行，无需
+    把整份PDF序列化发送到渲染进程。修复损坏文档的交叉引用表耗时与文件大小
+    成正比，调用方应在线程池中执行本函数，避免阻塞事件循环。
+    """
+
+    with _PAGE_COUNT_LOCK, get_fitz().open(stream=pdf_data, filetype="pdf") as doc:
+        return len(doc)
+
+
+def _render_pdf_pages(
+    pdf_path: str, start: int, stop: int, dpi: int
+) -> List[np.ndarray]:
+    """将PDF中 [start, stop) 范围内的页面渲染为RGB像素数组。
+
+    该函数在渲染进程池中执行，每个渲染任务都按路径独立打开一份文档。
+
+    参数:
+        pdf_path: PDF临时文件的路径
+        start: 起始页索引（包含）
+        stop: 结束页索引（不包含）
+        dpi: 渲染分辨率（DPI）
+
+    返回:
+        按页码顺序排列、形状为 (height, width, 3) 的uint8数组列表
+    """
+    fitz = get_fitz()
+    matrix = matrix_for_dpi(dpi)
+
+    pages = []
+    with fitz.open(pdf_path, filetype="pdf") as doc:
+        for page_num in range(start, stop):
+            pix = doc.load_page(page_num).get_pixmap(
+                matrix=matrix, colorspace=fitz.csRGB, alpha=False
+            )
+            pages.append(
+                np.frombuffer(pix.samples, dtype=np.uint8).reshape(
+                    pix.height, pix.width, pix.n
+                )
+            )
+    return pages
+
+
+async def _convert_pdf_to_images(
     pdf_data: bytes,
     dpi: int = 220,
-) -> Tuple[List[bytes], bool, int]:
-    """将PDF文件的每一页转换为独立的PNG图像。
+) -> Tuple[AsyncIterator[np.ndarray], bool, int]:
+    """将PDF文件的每一页渲染为RGB像素数组。
 
     使用PyMuPDF (fitz) 库将PDF页面渲染为高分辨率图像，以便进行OCR识别。
+    函数在统计出页数后立即返回逐页产出图像的异步迭代器，渲染在迭代时才
+    开始，先渲染完成的页面即可开始OCR识别，使后续页面的渲染与前面页面的
+    推理相互重叠。
 
     参数:
         pdf_data: PDF文件的二进制数据
@@ -126,33 +383,81 @@ def _convert_pdf_to_images(
 
     返回:
         元组包含三个元素:
-        - List[bytes]: 每页渲染后的PNG图像字节列表
+        - AsyncIterator[np.ndarray]: 按页码顺序产出形状为 (height, width, 3) 的
+          uint8数组；渲染失败时抛出 ImageProcessingError
         - bool: 固定返回True，表示这是PDF来源
         - int: PDF的页数
 
     异常:
-        ImageProcessingError: 当PDF解析或渲染失败时抛出
+        ImageProcessingError: 当PDF无法解析或不包含任何页面时抛出
     """
+    loop = asyncio.get_running_loop()
     try:
-        doc = fitz.open(stream=pdf_data, filetype="pdf")
-        page_count = len(doc)
-        if page_count == 0:
-            raise ImageProcessingError("提供的PDF文件不包含任何页面")
+        page_count = await loop.run_in_executor(None, _count_pdf_pages, pdf_data)
+    except RuntimeError as exc:
+        # PyMuPDF的解析与渲染错误（如 FileDataError）均派生自 RuntimeError
+        raise ImageProcessingError(f"PDF转换为图像失败: {exc}") from exc
+    if page_count == 0:
+        raise ImageProcessingError("提供的PDF文件不包含任何页面")
 
-        images = []
+    return _stream_pdf_pages(pdf_data, page_count, dpi), True, page_count
 
-        zoom = dpi / 72.0
-        matrix = fitz.Matrix(zoom, zoom)
 
-        for page_num in range(page_count):
-            page = doc.load_page(page_num)
-            pix = page.get_pixmap(matrix=matrix)
+async def _stream_pdf_pages(
+    pdf_data: bytes, page_count: int, dpi: int
+) -> AsyncIterator[np.ndarray]:
+    """在渲染进程池中分区间渲染PDF，并按页码顺序逐页产出图像。
 
-            img_data = pix.tobytes("png")
-            images.append(img_data)
+    PDF只写入一次临时文件，各渲染任务按路径打开，不必为每个区间重复序列化
+    整份文档。同时提交的渲染区间数受 pdf_max_pages_in_flight 限制，每取走
+    一个区间的结果才提交下一个区间，因此识别速度跟不上渲染时，服务进程中
+    驻留的已渲染页面数保持有界。迭代结束或被提前关闭时取消尚未开始的渲染
+    任务并删除临时文件。
+    """
+    loop = asyncio.get_running_loop()
+    pdf_path = await loop.run_in_executor(None, write_temp_pdf, pdf_data)
+    executor = get_render_executor()
+
+    chunk_size = min(-(-page_count // render_workers()), _PDF_RENDER_CHUNK_PAGES)
+    max_pending = max(1, get_settings().pdf_max_pages_in_flight // chunk_size)
+    starts = iter(range(0, page_count, chunk_size))
+    pending: Deque[asyncio.Future] = deque()
+
+    def submit_next() -> None:
+        start = next(starts, None)
+        if start is None:
+            return
+        stop = min(start + chunk_size, page_count)
+        try:
+            rendering = loop.run_in_executor(
+                executor, _render_pdf_pages, pdf_path, start, stop, dpi
+            )
+        except BrokenProcessPool as exc:
+            raise _render_failure(exc) from exc
+        pending.append(rendering)
 
-        doc.close()
-        return images, True, page_count
+    try:
+        for _ in range(max_pending):
+            submit_next()
+        while pending:
+            try:
+                chunk = await pending[0]
+            except Exception as exc:
+                raise _render_failure(exc) from exc
+            pending.popleft()
+            submit_next()
+            for page in chunk:
+                yield page
+    finally:
+        for rendering in pending:
+            rendering.cancel()
+        with suppress(OSError):
+            os.remove(pdf_path)
+
+
+def _render_failure(exc: BaseException) -> ImageProcessingError:
+    """将渲染过程中的异常转换为 ImageProcessingError，必要时丢弃已损坏的进程池。"""
+
+    discard_broken_executor(exc)
+    return ImageProcessingError(f"PDF转换为图像失败: {exc}")
 
-    except Exception as exc:
-        raise ImageProcessingError(f"PDF转换为图像失败: {exc}") from exc
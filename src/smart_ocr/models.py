@@ -5,7 +5,7 @@ from __future__ import annotations
 from enum import Enum
 from typing import Any, Dict, List, Optional
 
-from pydantic import BaseModel, Field, validator
+from pydantic import BaseModel, Field, field_validator, model_validator
 
 
 class TaskStatus(str, Enum):
@@ -39,7 +39,8 @@ class OCRRequest(BaseModel):
         default=None, description="经过Base64编码后的PDF二进制数据"
     )
 
-    @validator("image_url", "image_base64", "pdf_url", "pdf_base64", pre=True, always=True)
+    @field_validator("image_url", "image_base64", "pdf_url", "pdf_base64", mode="before")
+    @classmethod
     def _sanitize_empty_strings(cls, value: Optional[str]) -> Optional[str]:
         """将空字符串统一转换为None，避免误判。"""
 
@@ -47,21 +48,15 @@ class OCRRequest(BaseModel):
             return None
         return value
 
-    @validator("pdf_base64", always=True)
-    def _ensure_payload_provided(cls, value, values):
+    @model_validator(mode="after")
+    def _ensure_payload_provided(self) -> OCRRequest:
         """确保至少提供一种有效的输入数据来源。"""
 
-        candidates = [
-            values.get("image_url"),
-            values.get("image_base64"),
-            values.get("pdf_url"),
-            value,
-        ]
-        if not any(candidates):
+        if not (self.image_url or self.image_base64 or self.pdf_url or self.pdf_base64):
             raise ValueError(
                 "必须提供以下参数之一: image_url, image_base64, pdf_url, pdf_base64"
             )
-        return value
+        return self
 
 
 class TextPosition(BaseModel):
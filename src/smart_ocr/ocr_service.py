@@ -4,47 +4,30 @@ from __future__ import annotations
 
 import asyncio
 import logging
-import os
+import threading
 from concurrent.futures import ThreadPoolExecutor
-from contextlib import contextmanager
 from io import BytesIO
-from typing import Any, Dict, List, Sequence
+from typing import Any, Dict, List, Optional, Sequence, Union
 
+import cv2
 import numpy as np
 from paddleocr import PaddleOCR
-from PIL import Image
+from PIL import Image, ImageOps
 
 logger = logging.getLogger(__name__)
 
+# OCR输入图像：编码后的图像文件字节，或已解码的RGB像素数组
+ImageData = Union[bytes, np.ndarray]
 
-@contextmanager
-def _temporary_env(key: str, value: str | None):
-    """临时设置环境变量的上下文管理器。
+# EXIF中记录图像方向的标签编号
+_EXIF_ORIENTATION = 0x0112
 
-    在上下文生命周期内设置指定的环境变量，退出时自动恢复原值。
-    这对于控制CUDA设备可见性非常有用。
+# 可能携带EXIF的格式的文件头：JPEG、TIFF（小端/大端）；WebP另按RIFF头识别
+_EXIF_SIGNATURES = (b"\xff\xd8", b"II*\x00", b"MM\x00*")
 
-    参数:
-        key: 环境变量的名称
-        value: 要设置的值，如果为None则移除该环境变量
-
-    使用示例:
-        with _temporary_env("CUDA_VISIBLE_DEVICES", "0"):
-            # 在此代码块中只能看到GPU 0
-            model = load_model()
-    """
-    original = os.environ.get(key)
-    if value is None:
-        os.environ.pop(key, None)
-    else:
-        os.environ[key] = value
-    try:
-        yield
-    finally:
-        if original is None:
-            os.environ.pop(key, None)
-        else:
-            os.environ[key] = original
+# 串行化进程内所有PaddleOCR实例的构建：首次运行时各实例会下载并解压模型到
+# 同一个缓存目录，并发构建会同时写入相同的文件
+_MODEL_LOAD_LOCK = threading.Lock()
 
 
 class OCRService:
@@ -54,21 +37,40 @@ class OCRService:
     每个实例绑定到一个特定的GPU设备，避免多个实例之间的资源竞争。
     """
 
-    def __init__(self, gpu_id: int, lang: str = "ch", use_gpu: bool = True):
+    def __init__(
+        self,
+        gpu_id: int,
+        lang: str = "ch",
+        use_gpu: bool = True,
+        rec_batch_num: int = 16,
+        preprocess_executor: Optional[ThreadPoolExecutor] = None,
+        model_dirs: Optional[Dict[str, str]] = None,
+        enable_mkldnn: bool = False,
+    ):
         """初始化OCR服务实例。
 
         参数:
             gpu_id: 要使用的GPU设备编号（0-based）
             lang: PaddleOCR的语言模型标识，如 "ch" (中文)、"en" (英文)
             use_gpu: 是否启用GPU加速，False则使用CPU模式
+            rec_batch_num: 文本识别阶段每批处理的文本行数量
+            preprocess_executor: 执行图像解码与结果解析的共享线程池，为None时
+                使用事件循环的默认线程池
+            model_dirs: 自定义模型目录，键为 det_model_dir、rec_model_dir、
+                cls_model_dir，例如指向量化后的INT8推理模型
+            enable_mkldnn: CPU模式下是否启用oneDNN加速
         """
         self.gpu_id = gpu_id
         self.lang = lang
         self.use_gpu = use_gpu
+        self.rec_batch_num = rec_batch_num
         self._ocr_instance: PaddleOCR | None = None
         self._executor = ThreadPoolExecutor(
             max_workers=1, thread_name_prefix=f"paddleocr-gpu-{gpu_id}"
         )
+        self._preprocess_executor = preprocess_executor
+        self.model_dirs = dict(model_dirs or {})
+        self.enable_mkldnn = enable_mkldnn
         logger.info(
             "正在初始化OCR服务 (语言=%s, GPU编号=%s, 使用GPU=%s)",
             self.lang,
@@ -79,82 +81,146 @@ class OCRService:
     def _create_ocr_instance(self) -> PaddleOCR:
         """创建并初始化PaddleOCR实例。
 
-        该方法会临时设置CUDA_VISIBLE_DEVICES环境变量，确保PaddleOCR
-        只在指定的GPU设备上加载模型和执行推理。
+        通过 gpu_id 参数将推理引擎显式绑定到指定的GPU设备。CUDA只在进程内
+        首次初始化时读取 CUDA_VISIBLE_DEVICES，运行期间修改该环境变量无法
+        区分设备，因此不再依赖它。
 
         返回:
             配置好的PaddleOCR实例
         """
-        env_value = str(self.gpu_id) if self.use_gpu else None
-        with _temporary_env("CUDA_VISIBLE_DEVICES", env_value):
-            logger.info("正在加载PaddleOCR模型到设备 %s", env_value or "CPU")
-            return PaddleOCR(
-                use_angle_cls=True,
-                lang=self.lang,
-                use_gpu=self.use_gpu,
-                show_log=False,
-            )
+        logger.info(
+            "正在加载PaddleOCR模型到设备 %s", self.gpu_id if self.use_gpu else "CPU"
+        )
+        return PaddleOCR(
+            use_angle_cls=True,
+            lang=self.lang,
+            use_gpu=self.use_gpu,
+            gpu_id=self.gpu_id,
+            rec_batch_num=self.rec_batch_num,
+            enable_mkldnn=self.enable_mkldnn,
+            show_log=False,
+            **self.model_dirs,
+        )
 
     @property
     def ocr(self) -> PaddleOCR:
         """延迟初始化的PaddleOCR实例属性。
 
-        只有在首次访问时才会真正加载模型，避免不必要的资源占用。
+        只有在首次访问时才会真正加载模型，避免不必要的资源占用。多个GPU的
+        实例同时首次访问时，模型按顺序逐个构建。
 
         返回:
             PaddleOCR实例
         """
         if self._ocr_instance is None:
-            self._ocr_instance = self._create_ocr_instance()
+            with _MODEL_LOAD_LOCK:
+                if self._ocr_instance is None:
+                    self._ocr_instance = self._create_ocr_instance()
         return self._ocr_instance
 
-    async def recognize_image(self, image_data: bytes) -> List[Dict[str, Any]]:
+    async def warmup(self) -> None:
+        """在推理线程中预先加载模型并执行一次空白图像推理。
+
+        模型加载与首次推理（算子初始化、cuDNN算法选择）都较为耗时，在服务
+        启动阶段完成可以避免首个请求承担这部分延迟。模型构建在进程内串行执行，
+        首次推理则可在各GPU上并行进行。
+        """
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self._executor, self._warmup_sync)
+
+    def _warmup_sync(self) -> None:
+        """同步执行预热的内部方法。"""
+        self.ocr.ocr(np.full((32, 32, 3), 255, dtype=np.uint8), cls=True)
+        logger.info("GPU %s 上的OCR模型预热完成", self.gpu_id)
+
+    async def recognize_image(
+        self, image_data: ImageData, cls: bool = True
+    ) -> List[Dict[str, Any]]:
         """异步执行图像OCR识别。
 
-        该方法将同步的PaddleOCR推理过程包装为异步接口，避免阻塞事件循环。
-        实际的OCR推理在独立的线程池中执行。
+        图像解码与结果解析在共享的预处理线程池中执行，可在多个请求间并行；
+        只有模型推理提交到绑定GPU的单线程推理执行器。
 
         参数:
-            image_data: 图像文件的二进制数据
+            image_data: 图像文件的二进制数据，或形状为 (height, width, 3) 的RGB数组
+            cls: 是否对文本行执行方向分类；已知方向端正的图像（如渲染的PDF页面）
+                可关闭以省去分类模型的推理
 
         返回:
             识别结果列表，每个元素包含文本内容、置信度和位置信息
         """
         loop = asyncio.get_running_loop()
+        image = await loop.run_in_executor(
+            self._preprocess_executor, self._prepare_image, image_data
+        )
+        ocr_result = await loop.run_in_executor(
+            self._executor, self._recognize_sync, image, cls
+        )
         return await loop.run_in_executor(
-            self._executor, self._recognize_sync, image_data
+            self._preprocess_executor, self._parse_result, ocr_result
         )
 
-    def _recognize_sync(self, image_data: bytes) -> List[Dict[str, Any]]:
-        """同步执行OCR识别的内部方法。
+    def _recognize_sync(self, image: np.ndarray, cls: bool) -> Sequence:
+        """在推理线程中执行模型推理，模型在该线程中首次访问时加载。"""
+        return self.ocr.ocr(image, cls=cls)
+
+    def _prepare_image(self, image_data: ImageData) -> np.ndarray:
+        """将输入转换为送入模型的图像数组。
+
+        送入模型前确保图像为C连续的uint8数组；已满足条件的数组不会被复制，
+        否则PaddleOCR在预处理的每个环节都要处理跨步内存。
 
         参数:
-            image_data: 图像文件的二进制数据
+            image_data: 图像文件的二进制数据，或已解码的RGB数组（直接使用，不再解码）
 
         返回:
-            解析后的识别结果列表
+            形状为 (height, width, 3) 的C连续uint8数组
         """
-        image = self._bytes_to_image(image_data)
-        ocr_result = self.ocr.ocr(image, cls=True)
-        return self._parse_result(ocr_result)
+        if isinstance(image_data, np.ndarray):
+            image = image_data
+        else:
+            image = self._bytes_to_image(image_data)
+        return np.ascontiguousarray(image, dtype=np.uint8)
 
     def _bytes_to_image(self, data: bytes) -> np.ndarray:
         """将图像二进制数据转换为RGB格式的NumPy数组。
 
+        无需旋转的图像使用OpenCV直接从字节缓冲区解码（JPEG经由libjpeg-turbo），
+        并原地完成BGR到RGB的转换，不产生额外的图像副本。带有EXIF方向标记的
+        JPEG/TIFF/WebP图像，以及OpenCV不支持的格式（如GIF），改用PIL解码并
+        按EXIF方向转正，确保送入OCR的文字方向与拍摄时一致。
+
         参数:
             data: 图像文件的二进制数据（支持常见格式如PNG、JPEG等）
 
         返回:
             形状为 (height, width, 3) 的NumPy数组，数据类型为uint8
+
+        异常:
+            ValueError: 当数据为空或无法解码为图像时抛出
         """
-        with BytesIO(data) as buffer:
-            image = Image.open(buffer).convert("RGB")
-        return np.array(image)
+        if not data:
+            raise ValueError("无法解码图像数据")
+
+        if _exif_orientation(data) == 1:
+            image = cv2.imdecode(
+                np.frombuffer(data, dtype=np.uint8),
+                cv2.IMREAD_COLOR | cv2.IMREAD_IGNORE_ORIENTATION,
+            )
+            if image is not None:
+                return cv2.cvtColor(image, cv2.COLOR_BGR2RGB, dst=image)
+
+        try:
+            with BytesIO(data) as buffer, Image.open(buffer) as pil_image:
+                return np.asarray(ImageOps.exif_transpose(pil_image).convert("RGB"))
+        except OSError as exc:
+            raise ValueError("无法解码图像数据") from exc
 
     def _parse_result(self, result: Sequence) -> List[Dict[str, Any]]:
         """解析PaddleOCR的原始输出为标准化的字典格式。
 
-        PaddleOCR的输出结构较为复杂，该方法将其转换为更易使用的格式。
+        PaddleOCR的输出结构较为复杂，该方法将其转换为更易使用的格式。每张图像
+        的多边形坐标与置信度各通过一次NumPy转换得到Python列表，避免逐元素转换。
 
         参数:
             result: PaddleOCR的原始输出结果
@@ -169,25 +235,26 @@ class OCRService:
         if not result:
             return parsed
 
-        for image_result in result:
-            if not image_result:
+        for image_result in filter(None, result):
+            lines = list(filter(None, image_result))
+            if not lines:
                 continue
-            for line in image_result:
-                if not line:
-                    continue
-                polygon, (text, confidence) = line
-                parsed.append(
-                    {
-                        "text": text,
-                        "confidence": float(confidence),
-                        "position": {
-                            "top_left": polygon[0],
-                            "top_right": polygon[1],
-                            "bottom_right": polygon[2],
-                            "bottom_left": polygon[3],
-                        },
-                    }
-                )
+            polygons = np.asarray([line[0] for line in lines], dtype=np.float64).tolist()
+            texts, confidences = zip(*(line[1] for line in lines))
+            confidences = np.asarray(confidences, dtype=np.float64).tolist()
+            parsed.extend(
+                {
+                    "text": text,
+                    "confidence": confidence,
+                    "position": {
+                        "top_left": polygon[0],
+                        "top_right": polygon[1],
+                        "bottom_right": polygon[2],
+                        "bottom_left": polygon[3],
+                    },
+                }
+                for text, confidence, polygon in zip(texts, confidences, polygons)
+            )
         logger.debug(
             "GPU %s 上的OCR处理完成，识别到 %d 个文本区域",
             self.gpu_id,
@@ -203,3 +270,21 @@ class OCRService:
         logger.info("正在关闭GPU %s 的OCR服务", self.gpu_id)
         self._executor.shutdown(wait=True)
         logger.info("GPU %s 的OCR服务已关闭", self.gpu_id)
+
+
+def _exif_orientation(data: bytes) -> int:
+    """读取图像EXIF中的方向标记，无法识别或没有标记时返回1（无需旋转）。
+
+    只探测JPEG、TIFF和WebP：这些格式的EXIF在打开文件时即可读取，不会解码
+    像素。PNG等其他格式直接返回1，因为PIL读取PNG的EXIF需要先解码整张图像。
+    """
+    if not (
+        data.startswith(_EXIF_SIGNATURES)
+        or (data[:4] == b"RIFF" and data[8:12] == b"WEBP")
+    ):
+        return 1
+    try:
+        with BytesIO(data) as buffer, Image.open(buffer) as image:
+            return image.getexif().get(_EXIF_ORIENTATION, 1)
+    except OSError:
+        return 1
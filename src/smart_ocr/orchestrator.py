@@ -2,7 +2,6 @@ from __future__ import annotations
 
 """协调OCR请求处理流程的编排器，负责并发控制和资源调度。"""
 
-import asyncio
 import logging
 import time
 from typing import Any, Dict, List
@@ -10,12 +9,22 @@ from typing import Any, Dict, List
 from smart_ocr.config import Settings
 from smart_ocr.gpu_manager import GPUWorkerManager
 from smart_ocr.image_loader import ImageProcessingError, load_image_from_request
-from smart_ocr.models import OCRRequest, OCRResponse, TaskStatus
+from smart_ocr.models import (
+    OCRRequest,
+    OCRResponse,
+    OCRTextResult,
+    TaskStatus,
+    TextPosition,
+)
 from smart_ocr.task_tracker import get_task_tracker
 
 logger = logging.getLogger(__name__)
 
 
+class ServiceOverloadedError(Exception):
+    """在处理中的请求数已达上限、新请求被拒绝时抛出的异常。"""
+
+
 class OCROrchestrator:
     """OCR请求的中央协调器。
 
@@ -31,7 +40,7 @@ class OCROrchestrator:
         """
         self.settings = settings
         self.gpu_manager: GPUWorkerManager | None = None
-        self._semaphore = asyncio.Semaphore(self.settings.max_queue_size)
+        self._admitted = 0
         self.task_tracker = get_task_tracker()
 
     async def start(self):
@@ -42,6 +51,7 @@ class OCROrchestrator:
         logger.info("正在启动 OCR 编排器")
         self.gpu_manager = GPUWorkerManager(self.settings)
         await self.gpu_manager.initialize()
+        await self.gpu_manager.warmup()
         logger.info("OCR 编排器启动完成")
 
     async def stop(self):
@@ -60,9 +70,9 @@ class OCROrchestrator:
         """处理单个OCR请求的完整流程。
 
         该方法会执行以下步骤：
-        1. 通过信号量控制并发数，防止系统过载
+        1. 检查处理中的请求数，超过上限时直接拒绝，防止系统过载
         2. 加载输入文件（图像或PDF）
-        3. 对于PDF，逐页进行OCR识别
+        3. 对于PDF，将各页并发分发到所有GPU上进行OCR识别，页面渲染完成即开始识别
         4. 聚合所有识别结果并计算性能指标
         5. 返回标准化的响应对象
 
@@ -75,11 +85,18 @@ class OCROrchestrator:
 
         异常:
             RuntimeError: 当编排器未初始化时抛出
+            ServiceOverloadedError: 当处理中的请求数已达 max_queue_size 上限时抛出
             ImageProcessingError: 当文件加载或处理失败时抛出
         """
         if not self.gpu_manager:
             raise RuntimeError("OCR编排器尚未初始化，请先调用 start() 方法")
 
+        # 超出上限时立即拒绝，而不是让请求无限堆积在等待队列中
+        if self._admitted >= self.settings.max_queue_size:
+            raise ServiceOverloadedError(
+                f"服务繁忙：处理中的请求数已达上限 {self.settings.max_queue_size}"
+            )
+
         page_count = 1
         processed_pages = 0
         task_id = None
@@ -87,7 +104,7 @@ class OCROrchestrator:
         if tracker:
             task_id = tracker.create_task(total_pages=page_count)
 
-        await self._semaphore.acquire()
+        self._admitted += 1
         try:
             start_time = time.perf_counter()
 
@@ -117,7 +134,7 @@ class OCROrchestrator:
                         processed_pages=processed_pages,
                     )
             except ImageProcessingError as exc:
-                logger.error(f"文件加载失败: {exc}")
+                logger.error("文件加载失败: %s", exc)
                 if tracker and task_id:
                     await tracker.update_task_status(
                         task_id=task_id,
@@ -127,20 +144,9 @@ class OCROrchestrator:
                     )
                 raise
 
-            all_results = []
-            total_processing_time = 0.0
-
-            for page_idx, image_bytes in enumerate(image_list, start=1):
-                ocr_result = await self.gpu_manager.process_ocr_request(image_bytes)
-
-                for text_result in ocr_result["results"]:
-                    if is_pdf:
-                        text_result["page"] = page_idx
-
-                all_results.extend(ocr_result["results"])
-                total_processing_time += ocr_result["processing_time"]
-                processed_pages = page_idx
-
+            async def on_page_done(completed: int):
+                nonlocal processed_pages
+                processed_pages = completed
                 if tracker and task_id:
                     await tracker.update_task_status(
                         task_id=task_id,
@@ -149,6 +155,23 @@ class OCROrchestrator:
                         total_pages=page_count,
                     )
 
+            page_results = await self.gpu_manager.process_ocr_batch(
+                image_list,
+                on_page_done=on_page_done,
+                cls=not is_pdf or self.settings.pdf_angle_cls,
+            )
+
+            all_results = []
+            total_processing_time = 0.0
+
+            for page_idx, ocr_result in enumerate(page_results, start=1):
+                if is_pdf:
+                    for text_result in ocr_result["results"]:
+                        text_result["page"] = page_idx
+
+                all_results.extend(ocr_result["results"])
+                total_processing_time += ocr_result["processing_time"]
+
             duration_ms = (time.perf_counter() - start_time) * 1000
 
             response_data = {
@@ -169,7 +192,13 @@ class OCROrchestrator:
                     result=response_data,
                 )
 
-            return OCRResponse(**response_data)
+            # 结果由内部代码生成，结构已确定，跳过逐字段校验直接构造响应对象
+            return OCRResponse.model_construct(
+                **{
+                    **response_data,
+                    "results": [_build_text_result(item) for item in all_results],
+                }
+            )
 
         except Exception as exc:
             if tracker and task_id:
@@ -183,7 +212,12 @@ class OCROrchestrator:
             raise
 
         finally:
-            self._semaphore.release()
+            self._admitted -= 1
+
+    @property
+    def admitted_requests(self) -> int:
+        """当前已接纳且尚未完成的请求数量，可用于监控。"""
+        return self._admitted
 
     async def get_task_status(self, task_id: str) -> Dict[str, Any] | None:
         """查询指定任务的运行状态。
@@ -214,3 +248,13 @@ class OCROrchestrator:
         """获取当前任务的统计信息。"""
 
         return await self.task_tracker.get_statistics()
+
+
+def _build_text_result(item: Dict[str, Any]) -> OCRTextResult:
+    """在不触发校验的情况下，将单条识别结果字典转换为响应模型。"""
+    return OCRTextResult.model_construct(
+        text=item["text"],
+        confidence=item["confidence"],
+        position=TextPosition.model_construct(**item["position"]),
+        page=item.get("page"),
+    )
@@ -0,0 +1,91 @@
+"""PDF渲染的共享资源：常驻渲染进程池与按DPI缓存的缩放矩阵。
+
+服务端的PDF请求（image_loader）与 pdf_ticket 的并行加载共用同一个进程池，
+进程数由配置项 pdf_render_workers 决定。进程池在首次使用时创建，应在服务
+或脚本结束时调用 shutdown_render_executor() 关闭。
+"""
+
+from __future__ import annotations
+
+import multiprocessing
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import lru_cache
+from types import ModuleType
+from typing import TYPE_CHECKING
+
+from smart_ocr.config import get_settings
+
+if TYPE_CHECKING:
+    import fitz
+
+
+@lru_cache(maxsize=1)
+def get_fitz() -> ModuleType:
+    """按需导入PyMuPDF。
+
+    导入 fitz 会初始化MuPDF上下文（字体、CMap、色彩空间等），只处理图像的
+    进程无需承担这部分启动耗时与内存占用，因此推迟到首次处理PDF时再导入。
+    """
+
+    import fitz
+
+    return fitz
+
+
+@lru_cache(maxsize=8)
+def matrix_for_dpi(dpi: int) -> fitz.Matrix:
+    """返回指定DPI对应的缩放矩阵（PDF默认分辨率为72 DPI）。"""
+
+    zoom = dpi / 72.0
+    return get_fitz().Matrix(zoom, zoom)
+
+
+def render_workers() -> int:
+    """返回配置的PDF渲染进程数。"""
+
+    return max(1, get_settings().pdf_render_workers)
+
+
+@lru_cache(maxsize=1)
+def get_render_executor() -> ProcessPoolExecutor:
+    """返回用于PDF渲染的常驻进程池。
+
+    渲染在独立进程中执行，既不受GIL限制，也让MuPDF的内存占用与碎片留在
+    子进程中，不会累积到调用方进程。子进程使用 spawn 方式启动，避免 fork
+    已初始化CUDA与推理线程的父进程；因此直接运行的脚本需要将入口代码放在
+    ``if __name__ == "__main__":`` 保护之下。
+    """
+
+    return ProcessPoolExecutor(
+        max_workers=render_workers(),
+        mp_context=multiprocessing.get_context("spawn"),
+    )
+
+
+def shutdown_render_executor() -> None:
+    """关闭PDF渲染进程池，应在服务或脚本结束时调用。"""
+
+    if get_render_executor.cache_info().currsize:
+        get_render_executor().shutdown(cancel_futures=True)
+        get_render_executor.cache_clear()
+
+
+def discard_broken_executor(exc: BaseException) -> None:
+    """渲染进程异常退出（如MuPDF崩溃）后进程池不可再用，丢弃它以便下次重新创建。"""
+
+    if isinstance(exc, BrokenProcessPool):
+        get_render_executor.cache_clear()
+
+
+def write_temp_pdf(pdf_data: bytes) -> str:
+    """将PDF写入临时文件并返回其路径。
+
+    渲染进程按路径打开文档，整份PDF只需写一次磁盘，不必随每个渲染任务
+    重复序列化发送；调用方负责在渲染结束后删除该文件。
+    """
+
+    with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as file:
+        file.write(pdf_data)
+    return file.name
@@ -1,20 +1,49 @@
 """PDF票据处理模块。
 
 提供PDF加载、票据检测与拆分功能。
+
+导出的符号在首次访问时才导入对应子模块（PEP 562），仅导入本包的调用方
+不会加载PyMuPDF等较重的依赖。
 """
 
-from .pdf_loader import (
-    PDFLoadError,
-    PageImage,
-    load_pdf_from_bytes,
-    load_pdf_from_path,
-    load_pdf_to_images,
-)
-
-__all__ = [
-    "PDFLoadError",
-    "PageImage",
-    "load_pdf_from_bytes",
-    "load_pdf_from_path",
-    "load_pdf_to_images",
-]
+from importlib import import_module
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from .pdf_loader import (
+        PDFLoadError,
+        PageImage,
+        iter_pdf_pages,
+        load_pdf_from_bytes,
+        load_pdf_from_path,
+        load_pdf_to_images,
+        shutdown_render_executor,
+    )
+
+# 导出符号到所在子模块的映射
+_ATTR_TO_MODULE = {
+    "PDFLoadError": ".pdf_loader",
+    "PageImage": ".pdf_loader",
+    "iter_pdf_pages": ".pdf_loader",
+    "load_pdf_from_bytes": ".pdf_loader",
+    "load_pdf_from_path": ".pdf_loader",
+    "load_pdf_to_images": ".pdf_loader",
+    "shutdown_render_executor": ".pdf_loader",
+}
+
+__all__ = list(_ATTR_TO_MODULE)
+
+
+def __getattr__(name: str) -> Any:
+    """按需导入子模块并返回其中的导出符号。"""
+    module_name = _ATTR_TO_MODULE.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list:
+    """使延迟导出的符号也出现在 dir() 结果中。"""
+    return sorted(set(globals()) | set(__all__))
@@ -7,12 +7,27 @@
 from __future__ import annotations
 
 import io
-from dataclasses import dataclass
+import os
+from concurrent.futures import Future
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import suppress
+from dataclasses import dataclass, field
+from functools import lru_cache
 from pathlib import Path
-from typing import List, Optional, Union
+from typing import Dict, Iterator, List, Optional, Tuple, Union
 
 from PIL import Image
 
+from ..config import get_settings
+from ..pdf_render import (
+    discard_broken_executor,
+    get_render_executor,
+    matrix_for_dpi,
+    render_workers,
+    shutdown_render_executor,
+    write_temp_pdf,
+)
+
 try:
     import fitz  # PyMuPDF
 except ImportError:
@@ -26,14 +41,15 @@ class PDFLoadError(Exception):
     """
 
 
-@dataclass
+@dataclass(slots=True, init=False)
 class PageImage:
     """PDF单页渲染后的图像及其元信息。
     
     属性:
         page_number: 页码（从1开始）
         image: PIL图像对象
-        image_bytes: 图像的二进制数据（PNG或JPEG格式）
+        image_bytes: 图像的二进制数据（PNG或JPEG格式），首次访问时才进行编码，
+            其他格式可通过 encoded() 获取
         width: 图像宽度（像素）
         height: 图像高度（像素）
         dpi: 渲染时使用的DPI分辨率
@@ -42,19 +58,83 @@ class PageImage:
     
     page_number: int
     image: Image.Image
-    image_bytes: bytes
     width: int
     height: int
     dpi: int
     format: str
+    _encoded_cache: Dict[str, bytes] = field(
+        init=False, default_factory=dict, repr=False, compare=False
+    )
+    
+    def __init__(
+        self,
+        page_number: int,
+        image: Image.Image,
+        width: int,
+        height: int,
+        dpi: int,
+        format: str,
+        image_bytes: Optional[bytes] = None,
+    ) -> None:
+        """构建页面对象。
+        
+        参数:
+            image_bytes: 已按 format 编码的图像数据，可选；传入时直接作为
+                image_bytes 的值，不再重新编码
+        """
+        self.page_number = page_number
+        self.image = image
+        self.width = width
+        self.height = height
+        self.dpi = dpi
+        self.format = format
+        self._encoded_cache = {}
+        if image_bytes is not None:
+            self._encoded_cache[format] = image_bytes
+    
+    @property
+    def image_bytes(self) -> bytes:
+        """按输出格式编码后的图像数据，只在首次访问时编码一次。"""
+        return self.encoded(self.format)
+    
+    def encoded(self, fmt: Optional[str] = None) -> bytes:
+        """返回按指定格式编码的图像数据，每种格式只编码一次。
+        
+        参数:
+            fmt: 编码格式，支持 'PNG' 或 'JPEG'，默认使用页面的输出格式
+        
+        返回:
+            编码后的图像二进制数据
+        
+        异常:
+            ValueError: 格式不受支持时抛出
+        """
+        fmt = self.format if fmt is None else _normalize_format(fmt)
+        data = self._encoded_cache.get(fmt)
+        if data is None:
+            buffer = io.BytesIO()
+            self.image.save(buffer, format=fmt, **_save_options(fmt))
+            data = buffer.getvalue()
+            self._encoded_cache[fmt] = data
+        return data
+
+
+def _save_options(output_format: str) -> dict:
+    """返回编码时使用的参数：PNG采用低压缩级别，以编码速度优先；
+    JPEG使用较高质量并做4:2:0色度子采样，兼顾OCR识别效果与体积。"""
+    if output_format == "PNG":
+        return {"compress_level": 1}
+    return {"quality": 90, "subsampling": 2}
 
 
 def load_pdf_to_images(
     pdf_source: Union[str, bytes, Path],
     dpi: Optional[int] = None,
-    output_format: str = "PNG",
+    output_format: Optional[str] = None,
     save_to_disk: bool = False,
     save_dir: Optional[Union[str, Path]] = None,
+    include_bytes: bool = False,
+    parallel: bool = False,
 ) -> List[PageImage]:
     """将PDF转换为高质量图像列表（统一入口函数）。
     
@@ -63,9 +143,13 @@ def load_pdf_to_images(
     参数:
         pdf_source: PDF数据源，可以是文件路径（str或Path）或字节流（bytes）
         dpi: 渲染分辨率（DPI），默认从配置读取（220）
-        output_format: 输出图像格式，支持 'PNG' 或 'JPEG'，默认 'PNG'
+        output_format: 输出图像格式，支持 'PNG' 或 'JPEG'，默认从配置读取（JPEG）
         save_to_disk: 是否将渲染后的图像保存到磁盘（用于调试）
         save_dir: 保存目录路径，如果save_to_disk为True但未指定，则使用当前目录
+        include_bytes: 是否在返回前完成图像编码，默认False，即首次访问 image_bytes 时才编码
+        parallel: 是否在共享的渲染进程池中并行渲染页面，默认False即在当前进程内渲染。
+            进程池以 spawn 方式启动，直接运行的脚本需将入口代码放在
+            ``if __name__ == "__main__":`` 保护之下，并在结束时调用 shutdown_render_executor()
     
     返回:
         PageImage对象列表，每个对象包含一页的图像及元信息
@@ -94,6 +178,8 @@ def load_pdf_to_images(
             output_format=output_format,
             save_to_disk=save_to_disk,
             save_dir=save_dir,
+            include_bytes=include_bytes,
+            parallel=parallel,
         )
     elif isinstance(pdf_source, bytes):
         return load_pdf_from_bytes(
@@ -102,6 +188,8 @@ def load_pdf_to_images(
             output_format=output_format,
             save_to_disk=save_to_disk,
             save_dir=save_dir,
+            include_bytes=include_bytes,
+            parallel=parallel,
         )
     else:
         raise ValueError(
@@ -113,18 +201,24 @@ def load_pdf_to_images(
 def load_pdf_from_path(
     pdf_path: Union[str, Path],
     dpi: Optional[int] = None,
-    output_format: str = "PNG",
+    output_format: Optional[str] = None,
     save_to_disk: bool = False,
     save_dir: Optional[Union[str, Path]] = None,
+    include_bytes: bool = False,
+    parallel: bool = False,
 ) -> List[PageImage]:
     """从文件路径加载PDF并转换为图像列表。
     
     参数:
         pdf_path: PDF文件路径
         dpi: 渲染分辨率（DPI），默认从配置读取（220）
-        output_format: 输出图像格式，支持 'PNG' 或 'JPEG'，默认 'PNG'
+        output_format: 输出图像格式，支持 'PNG' 或 'JPEG'，默认从配置读取（JPEG）
         save_to_disk: 是否将渲染后的图像保存到磁盘（用于调试）
         save_dir: 保存目录路径，如果save_to_disk为True但未指定，则使用当前目录
+        include_bytes: 是否在返回前完成图像编码，默认False，即首次访问 image_bytes 时才编码
+        parallel: 是否在共享的渲染进程池中并行渲染页面，默认False即在当前进程内渲染。
+            进程池以 spawn 方式启动，直接运行的脚本需将入口代码放在
+            ``if __name__ == "__main__":`` 保护之下，并在结束时调用 shutdown_render_executor()
     
     返回:
         PageImage对象列表
@@ -132,43 +226,39 @@ def load_pdf_from_path(
     异常:
         PDFLoadError: PDF文件不存在、无法读取或解析失败时抛出
     """
-    path = Path(pdf_path)
-    if not path.exists():
-        raise PDFLoadError(f"PDF文件不存在: {pdf_path}")
-    
-    if not path.is_file():
-        raise PDFLoadError(f"路径不是文件: {pdf_path}")
-    
-    try:
-        with open(path, "rb") as f:
-            pdf_bytes = f.read()
-    except Exception as exc:
-        raise PDFLoadError(f"读取PDF文件失败: {exc}") from exc
-    
-    return load_pdf_from_bytes(
-        pdf_bytes=pdf_bytes,
+    # 直接交给MuPDF按路径打开，避免先把整个文件读入Python字节串再复制一次
+    return _render_document(
+        _check_pdf_path(pdf_path),
         dpi=dpi,
         output_format=output_format,
         save_to_disk=save_to_disk,
         save_dir=save_dir,
+        include_bytes=include_bytes,
+        parallel=parallel,
     )
 
 
 def load_pdf_from_bytes(
     pdf_bytes: bytes,
     dpi: Optional[int] = None,
-    output_format: str = "PNG",
+    output_format: Optional[str] = None,
     save_to_disk: bool = False,
     save_dir: Optional[Union[str, Path]] = None,
+    include_bytes: bool = False,
+    parallel: bool = False,
 ) -> List[PageImage]:
     """从字节流加载PDF并转换为图像列表。
     
     参数:
         pdf_bytes: PDF文件的二进制数据
         dpi: 渲染分辨率（DPI），默认从配置读取（220）
-        output_format: 输出图像格式，支持 'PNG' 或 'JPEG'，默认 'PNG'
+        output_format: 输出图像格式，支持 'PNG' 或 'JPEG'，默认从配置读取（JPEG）
         save_to_disk: 是否将渲染后的图像保存到磁盘（用于调试）
         save_dir: 保存目录路径，如果save_to_disk为True但未指定，则使用当前目录
+        include_bytes: 是否在返回前完成图像编码，默认False，即首次访问 image_bytes 时才编码
+        parallel: 是否在共享的渲染进程池中并行渲染页面，默认False即在当前进程内渲染。
+            进程池以 spawn 方式启动，直接运行的脚本需将入口代码放在
+            ``if __name__ == "__main__":`` 保护之下，并在结束时调用 shutdown_render_executor()
     
     返回:
         PageImage对象列表
@@ -179,14 +269,116 @@ def load_pdf_from_bytes(
     if not pdf_bytes:
         raise PDFLoadError("PDF字节流为空")
     
+    return _render_document(
+        pdf_bytes,
+        dpi=dpi,
+        output_format=output_format,
+        save_to_disk=save_to_disk,
+        save_dir=save_dir,
+        include_bytes=include_bytes,
+        parallel=parallel,
+    )
+
+
+def iter_pdf_pages(
+    pdf_source: Union[str, bytes, Path],
+    dpi: Optional[int] = None,
+    output_format: Optional[str] = None,
+) -> Iterator[PageImage]:
+    """逐页渲染PDF并依次产出 PageImage。
+    
+    与 load_pdf_to_images 一次性返回全部页面不同，本函数在调用方线程中按需
+    渲染，每次迭代才渲染下一页，由本函数持有的页面图像始终只有一页，适合
+    页数较多、逐页处理的场景。
+    
+    参数:
+        pdf_source: PDF数据源，可以是文件路径（str或Path）或字节流（bytes）
+        dpi: 渲染分辨率（DPI），默认从配置读取（220）
+        output_format: 输出图像格式，支持 'PNG' 或 'JPEG'，默认从配置读取（JPEG）
+    
+    返回:
+        按页码顺序产出 PageImage 对象的迭代器
+    
+    异常:
+        PDFLoadError: PDF加载、解析或渲染失败时抛出
+        ValueError: 参数格式不正确时抛出
+    
+    示例:
+        >>> for page in iter_pdf_pages("document.pdf"):
+        ...     process(page)
+    """
+    if isinstance(pdf_source, (str, Path)):
+        source: _PDFSource = _check_pdf_path(pdf_source)
+    elif isinstance(pdf_source, bytes):
+        if not pdf_source:
+            raise PDFLoadError("PDF字节流为空")
+        source = pdf_source
+    else:
+        raise ValueError(
+            f"不支持的pdf_source类型: {type(pdf_source)}，"
+            f"期望 str、Path 或 bytes"
+        )
+    
     if dpi is None:
-        from ..config import get_settings
         dpi = get_settings().pdf_render_dpi
+    output_format = _normalize_format(
+        output_format or get_settings().pdf_render_format
+    )
+    matrix = matrix_for_dpi(dpi)
     
-    if output_format.upper() not in ("PNG", "JPEG", "JPG"):
-        raise ValueError(f"不支持的输出格式: {output_format}，仅支持 PNG 或 JPEG")
+    # PyMuPDF渲染期间持有GIL且不是线程安全的，因此直接在调用方线程中渲染
+    with _open_document(source) as doc:
+        page_count = len(doc)
+        if page_count == 0:
+            raise PDFLoadError("PDF文档不包含任何页面")
+        
+        for page_idx in range(page_count):
+            rendered = _render_pixmaps(doc, page_idx, page_idx + 1, matrix)[0]
+            yield _build_page(page_idx, rendered, dpi, output_format)
+
+
+# PDF数据源：文件路径字符串或PDF字节流
+_PDFSource = Union[str, bytes]
+
+
+def _check_pdf_path(pdf_path: Union[str, Path]) -> str:
+    """校验PDF路径存在且为文件，返回可直接交给MuPDF打开的路径字符串。"""
+    path = Path(pdf_path)
+    if not path.exists():
+        raise PDFLoadError(f"PDF文件不存在: {pdf_path}")
     
-    output_format = "JPEG" if output_format.upper() == "JPG" else output_format.upper()
+    if not path.is_file():
+        raise PDFLoadError(f"路径不是文件: {pdf_path}")
+    
+    return str(path)
+
+
+def _open_document(source: _PDFSource) -> fitz.Document:
+    """按数据源类型打开PDF文档：路径交给MuPDF直接读取，字节流按流打开。"""
+    try:
+        if isinstance(source, str):
+            return fitz.open(source, filetype="pdf")
+        return fitz.open(stream=source, filetype="pdf")
+    except Exception as exc:
+        raise PDFLoadError(f"无法打开PDF文档，可能文件已损坏: {exc}") from exc
+
+
+def _render_document(
+    source: _PDFSource,
+    dpi: Optional[int],
+    output_format: Optional[str],
+    save_to_disk: bool,
+    save_dir: Optional[Union[str, Path]],
+    include_bytes: bool,
+    parallel: bool,
+) -> List[PageImage]:
+    """打开PDF数据源并将每页渲染为 PageImage，供路径与字节流两种入口共用。"""
+    if dpi is None:
+        dpi = get_settings().pdf_render_dpi
+    
+    output_format = _normalize_format(
+        output_format or get_settings().pdf_render_format
+    )
     
     if save_to_disk:
         if save_dir is None:
@@ -195,59 +387,130 @@ def load_pdf_from_bytes(
             save_dir = Path(save_dir)
         save_dir.mkdir(parents=True, exist_ok=True)
     
-    try:
-        doc = fitz.open(stream=pdf_bytes, filetype="pdf")
-    except Exception as exc:
-        raise PDFLoadError(f"无法打开PDF文档，可能文件已损坏: {exc}") from exc
-    
+    doc = _open_document(source)
     try:
         page_count = len(doc)
         if page_count == 0:
             raise PDFLoadError("PDF文档不包含任何页面")
         
-        pages: List[PageImage] = []
-        
-        zoom = dpi / 72.0
-        matrix = fitz.Matrix(zoom, zoom)
+        workers = min(render_workers(), page_count) if parallel else 1
+        if page_count <= 2 or workers <= 1:
+            rendered = _render_pixmaps(doc, 0, page_count, matrix_for_dpi(dpi))
+        else:
+            rendered = _render_in_pool(source, page_count, dpi, workers)
+    finally:
+        doc.close()
+    
+    pages: List[PageImage] = []
+    for page_idx, page_pixels in enumerate(rendered):
+        page = _build_page(page_idx, page_pixels, dpi, output_format)
+        pages.append(page)
         
-        for page_idx in range(page_count):
+        if save_to_disk and save_dir:
+            save_path = save_dir / f"page_{page_idx + 1}.{output_format.lower()}"
             try:
-                page = doc.load_page(page_idx)
-                pix = page.get_pixmap(matrix=matrix)
-                
-                img_bytes = pix.tobytes(output_format.lower())
-                
-                pil_image = Image.open(io.BytesIO(img_bytes))
-                
-                page_image = PageImage(
-                    page_number=page_idx + 1,
-                    image=pil_image,
-                    image_bytes=img_bytes,
-                    width=pil_image.width,
-                    height=pil_image.height,
-                    dpi=dpi,
-                    format=output_format,
-                )
-                
-                pages.append(page_image)
-                
-                if save_to_disk and save_dir:
-                    save_path = save_dir / f"page_{page_idx + 1}.{output_format.lower()}"
-                    try:
-                        pil_image.save(save_path)
-                    except Exception as save_exc:
-                        raise PDFLoadError(
-                            f"保存第{page_idx + 1}页图像失败: {save_exc}"
-                        ) from save_exc
-                
-            except PDFLoadError:
-                raise
-            except Exception as exc:
+                # 写盘内容即编码结果，缓存到页面上，后续访问 image_bytes 无需再次编码
+                save_path.write_bytes(page.encoded())
+            except Exception as save_exc:
                 raise PDFLoadError(
-                    f"渲染第{page_idx + 1}页失败: {exc}"
-                ) from exc
-        
-        return pages
+                    f"保存第{page_idx + 1}页图像失败: {save_exc}"
+                ) from save_exc
+        elif include_bytes:
+            page.encoded()
     
+    return pages
+
+
+@lru_cache(maxsize=8)
+def _normalize_format(output_format: str) -> str:
+    """校验输出格式并统一为大写形式，JPG视为JPEG的别名。"""
+    upper = output_format.upper()
+    if upper not in ("PNG", "JPEG", "JPG"):
+        raise ValueError(f"不支持的输出格式: {output_format}，仅支持 PNG 或 JPEG")
+    return "JPEG" if upper == "JPG" else upper
+
+
+# 单页渲染结果：(图像模式, 宽度, 高度, 原始像素数据)
+_RenderedPage = Tuple[str, int, int, bytes]
+
+
+def _build_page(
+    page_idx: int, rendered: _RenderedPage, dpi: int, output_format: str
+) -> PageImage:
+    """基于渲染得到的原始像素数据构建 PageImage。"""
+    mode, width, height, samples = rendered
+    # 直接基于像素缓冲区构建图像，避免先编码再解码的往返开销
+    pil_image = Image.frombytes(mode, (width, height), samples)
+    return PageImage(
+        page_number=page_idx + 1,
+        image=pil_image,
+        width=pil_image.width,
+        height=pil_image.height,
+        dpi=dpi,
+        format=output_format,
+    )
+
+
+def _render_pixmaps(
+    doc: fitz.Document, start: int, stop: int, matrix: fitz.Matrix
+) -> List[_RenderedPage]:
+    """渲染文档中 [start, stop) 范围内的页面，返回原始像素数据。"""
+    rendered: List[_RenderedPage] = []
+    for page_idx in range(start, stop):
+        try:
+            pix = doc.load_page(page_idx).get_pixmap(matrix=matrix, alpha=False)
+        except Exception as exc:
+            raise PDFLoadError(f"渲染第{page_idx + 1}页失败: {exc}") from exc
+        mode = "RGB" if pix.n == 3 else "L"
+        rendered.append((mode, pix.width, pix.height, pix.samples))
+    return rendered
+
+
+def _render_page_range(
+    source: _PDFSource, start: int, stop: int, dpi: int
+) -> List[_RenderedPage]:
+    """在渲染进程中独立打开文档并渲染指定范围的页面。"""
+    with _open_document(source) as doc:
+        return _render_pixmaps(doc, start, stop, matrix_for_dpi(dpi))
+
+
+def _render_in_pool(
+    source: _PDFSource, page_count: int, dpi: int, workers: int
+) -> List[_RenderedPage]:
+    """将页面划分为连续区间，在渲染进程池中并行渲染并按页码顺序合并结果。
+
+    PyMuPDF不支持多线程并发调用，因此并行渲染使用进程而不是线程。字节流
+    数据源先写入一个临时文件，各渲染任务按路径打开，不必为每个区间重复
+    序列化整份文档；渲染结束后删除该临时文件。
+    """
+    chunk_size = -(-page_count // workers)
+    executor = get_render_executor()
+    pdf_path = source
+    if isinstance(source, bytes):
+        try:
+            pdf_path = write_temp_pdf(source)
+        except OSError as exc:
+            raise PDFLoadError(f"写入PDF临时文件失败: {exc}") from exc
+    futures: List[Future] = []
+    try:
+        for start in range(0, page_count, chunk_size):
+            futures.append(
+                executor.submit(
+                    _render_page_range,
+                    pdf_path,
+                    start,
+                    min(start + chunk_size, page_count),
+                    dpi,
+                )
+            )
+        return [page for future in futures for page in future.result()]
+    except BrokenProcessPool as exc:
+        discard_broken_executor(exc)
+        raise PDFLoadError(f"PDF渲染进程异常退出: {exc}") from exc
     finally:
-        doc.close()
+        for future in futures:
+            future.cancel()
+        if isinstance(source, bytes):
+            with suppress(OSError):
+                os.remove(pdf_path)
+
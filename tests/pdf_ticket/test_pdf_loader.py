@@ -10,13 +10,17 @@ from pathlib import Path
 
 import fitz  # PyMuPDF
 import pytest
+from PIL import Image
 
+from smart_ocr.config import get_settings
 from smart_ocr.pdf_ticket.pdf_loader import (
     PDFLoadError,
     PageImage,
+    iter_pdf_pages,
     load_pdf_from_bytes,
     load_pdf_from_path,
     load_pdf_to_images,
+    shutdown_render_executor,
 )
 
 
@@ -79,7 +83,7 @@ class TestLoadPdfFromBytes:
             assert page.width > 0
             assert page.height > 0
             assert page.dpi == 220
-            assert page.format == "PNG"
+            assert page.format == "JPEG"
             assert page.image is not None
             assert len(page.image_bytes) > 0
     
@@ -161,8 +165,8 @@ class TestLoadPdfFromBytes:
             
             assert len(pages) == 2
             
-            page1_path = Path(temp_dir) / "page_1.png"
-            page2_path = Path(temp_dir) / "page_2.png"
+            page1_path = Path(temp_dir) / "page_1.jpeg"
+            page2_path = Path(temp_dir) / "page_2.jpeg"
             
             assert page1_path.exists()
             assert page2_path.exists()
@@ -278,6 +282,60 @@ class TestLoadPdfToImages:
         assert pages[0].format == "JPEG"
 
 
+class TestIterPdfPages:
+    """测试iter_pdf_pages函数。"""
+    
+    def test_iter_pages_matches_eager_loading(self):
+        """测试逐页迭代与一次性加载得到相同的页面。"""
+        pdf_bytes = create_test_pdf(page_count=3)
+        
+        eager = load_pdf_from_bytes(pdf_bytes, dpi=72)
+        lazy = list(iter_pdf_pages(pdf_bytes, dpi=72))
+        
+        assert [page.page_number for page in lazy] == [1, 2, 3]
+        for expected, page in zip(eager, lazy):
+            assert page.image.tobytes() == expected.image.tobytes()
+    
+    def test_iter_pages_stops_early(self):
+        """测试提前结束迭代时可以正常释放资源。"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            pdf_path = Path(tmpdir) / "test.pdf"
+            pdf_path.write_bytes(create_test_pdf(page_count=5))
+            
+            pages = iter_pdf_pages(pdf_path, dpi=72)
+            first = next(pages)
+            pages.close()
+        
+        assert first.page_number == 1
+    
+    def test_iter_pages_corrupted_pdf(self):
+        """测试逐页迭代损坏的PDF时抛出异常。"""
+        with pytest.raises(PDFLoadError, match="无法打开PDF文档"):
+            next(iter_pdf_pages(create_corrupted_pdf()))
+
+
+class TestParallelRendering:
+    """测试parallel=True时在渲染进程池中加载PDF。"""
+    
+    def test_parallel_matches_in_process(self, monkeypatch, tmp_path):
+        """测试进程池渲染与进程内渲染得到相同的页面，且进程池可以关闭。"""
+        monkeypatch.setattr(get_settings(), "pdf_render_workers", 2)
+        monkeypatch.setattr(tempfile, "tempdir", str(tmp_path))
+        pdf_bytes = create_test_pdf(page_count=5)
+        
+        shutdown_render_executor()
+        try:
+            parallel = load_pdf_from_bytes(pdf_bytes, dpi=72, parallel=True)
+        finally:
+            shutdown_render_executor()
+        in_process = load_pdf_from_bytes(pdf_bytes, dpi=72)
+        
+        assert [page.page_number for page in parallel] == [1, 2, 3, 4, 5]
+        assert not list(tmp_path.iterdir())
+        for expected, page in zip(in_process, parallel):
+            assert page.image.tobytes() == expected.image.tobytes()
+
+
 class TestPageImageDataClass:
     """测试PageImage数据类。"""
     
@@ -302,6 +360,43 @@ class TestPageImageDataClass:
         assert page.dpi == 150
         assert page.width > 0
         assert page.height > 0
+    
+    def test_page_image_encoded_is_cached_per_format(self):
+        """测试encoded()按格式缓存编码结果，且image_bytes与页面格式一致。"""
+        pdf_bytes = create_test_pdf(page_count=1)
+        
+        page = load_pdf_from_bytes(
+            pdf_bytes, dpi=72, output_format="PNG", include_bytes=True
+        )[0]
+        
+        assert page.image_bytes is page.encoded("PNG")
+        assert page.image_bytes.startswith(b"\x89PNG")
+        
+        jpeg_bytes = page.encoded("jpg")
+        assert jpeg_bytes.startswith(b"\xff\xd8")
+        assert page.encoded("JPEG") is jpeg_bytes
+    
+    def test_page_image_direct_construction(self):
+        """测试直接构造PageImage，image_bytes可选且传入时不再重新编码。"""
+        image = Image.new("RGB", (20, 10), "white")
+        
+        lazy = PageImage(
+            page_number=1, image=image, width=20, height=10, dpi=72, format="PNG"
+        )
+        assert lazy.image_bytes.startswith(b"\x89PNG")
+        
+        encoded = b"pre-encoded"
+        eager = PageImage(
+            page_number=1,
+            image=image,
+            image_bytes=encoded,
+            width=20,
+            height=10,
+            dpi=72,
+            format="PNG",
+        )
+        assert eager.image_bytes is encoded
+        assert eager == lazy
 
 
 class TestEdgeCases:
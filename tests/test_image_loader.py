@@ -0,0 +1,187 @@
+"""image_loader下载逻辑的单元测试。
+
+使用 httpx.MockTransport 模拟远程服务器，覆盖下载缓存（命中、304校验、
+按容量淘汰、并发合并）以及响应体大小限制。
+"""
+
+import asyncio
+from typing import Awaitable, Callable, List
+
+import httpx
+import pytest
+
+from smart_ocr import image_loader
+from smart_ocr.config import get_settings
+from smart_ocr.image_loader import ImageProcessingError, _DownloadCache, _read_body
+
+
+def run_with_server(
+    monkeypatch: pytest.MonkeyPatch,
+    handler: Callable[[httpx.Request], Awaitable[httpx.Response]],
+    scenario: Callable[[], Awaitable],
+):
+    """将共享HTTP客户端替换为使用模拟服务器的客户端，并运行测试场景。
+
+    参数:
+        monkeypatch: pytest 的 monkeypatch 夹具
+        handler: 模拟服务器的请求处理函数
+        scenario: 在替换后的客户端上执行的异步测试场景
+
+    返回:
+        测试场景的返回值
+    """
+    async def main():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            monkeypatch.setattr(image_loader, "_get_http_client", lambda: client)
+            return await scenario()
+
+    return asyncio.run(main())
+
+
+class RecordingServer:
+    """按URL返回固定内容的模拟服务器，支持ETag条件请求并记录收到的请求。"""
+
+    def __init__(self, bodies: dict, etag: bool = True):
+        self.bodies = bodies
+        self.etag = etag
+        self.requests: List[httpx.Request] = []
+        self.before_response: Callable[[httpx.Request], None] = lambda request: None
+
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        await asyncio.sleep(0.01)
+        self.before_response(request)
+        body = self.bodies[str(request.url)]
+        tag = f'"{len(body)}"'
+        if self.etag and request.headers.get("if-none-match") == tag:
+            return httpx.Response(304)
+        headers = {"ETag": tag} if self.etag else {}
+        return httpx.Response(200, content=body, headers=headers)
+
+
+class TestDownloadCache:
+    """测试_DownloadCache的缓存与并发合并行为。"""
+
+    def test_cache_hit_revalidates_with_etag(self, monkeypatch):
+        """测试命中缓存时发送If-None-Match，服务器返回304后复用缓存内容。"""
+        url = "http://example.com/a.png"
+        server = RecordingServer({url: b"image-a"})
+        cache = _DownloadCache(max_bytes=1024)
+
+        async def scenario():
+            return [await cache.get(url, 5.0), await cache.get(url, 5.0)]
+
+        first, second = run_with_server(monkeypatch, server, scenario)
+
+        assert first == second == b"image-a"
+        assert "if-none-match" not in server.requests[0].headers
+        assert server.requests[1].headers["if-none-match"] == '"7"'
+
+    def test_revalidation_after_eviction_returns_cached_body(self, monkeypatch):
+        """测试等待304响应期间条目被淘汰时仍返回缓存内容并重新写入缓存。"""
+        url = "http://example.com/a.png"
+        server = RecordingServer({url: b"image-a"})
+        cache = _DownloadCache(max_bytes=1024)
+
+        def evict(request):
+            cache._entries.clear()
+            cache._size = 0
+
+        async def scenario():
+            await cache.get(url, 5.0)
+            server.before_response = evict
+            return await cache.get(url, 5.0)
+
+        assert run_with_server(monkeypatch, server, scenario) == b"image-a"
+        assert list(cache._entries) == [url]
+        assert cache._size == len(b"image-a")
+
+    def test_evicts_least_recently_used_over_max_bytes(self, monkeypatch):
+        """测试总大小超过download_cache_max_bytes时淘汰最久未使用的条目。"""
+        urls = [f"http://example.com/{name}.png" for name in "abc"]
+        server = RecordingServer({url: b"x" * 6 for url in urls})
+        cache = _DownloadCache(max_bytes=12)
+
+        async def scenario():
+            for url in urls:
+                await cache.get(url, 5.0)
+
+        run_with_server(monkeypatch, server, scenario)
+
+        assert list(cache._entries) == urls[1:]
+        assert cache._size == 12
+
+    def test_skips_oversized_and_untagged_responses(self, monkeypatch):
+        """测试超过缓存容量或不带ETag的响应不会写入缓存。"""
+        big = "http://example.com/big.png"
+        small = "http://example.com/small.png"
+        server = RecordingServer({big: b"x" * 20, small: b"x"})
+        cache = _DownloadCache(max_bytes=10)
+
+        async def scenario():
+            await cache.get(big, 5.0)
+            server.etag = False
+            await cache.get(small, 5.0)
+
+        run_with_server(monkeypatch, server, scenario)
+
+        assert not cache._entries
+        assert cache._size == 0
+
+    def test_concurrent_requests_share_one_download(self, monkeypatch):
+        """测试同一URL的并发请求只发起一次下载。"""
+        url = "http://example.com/a.png"
+        server = RecordingServer({url: b"image-a"})
+        cache = _DownloadCache(max_bytes=1024)
+
+        async def scenario():
+            return await asyncio.gather(*(cache.get(url, 5.0) for _ in range(5)))
+
+        results = run_with_server(monkeypatch, server, scenario)
+
+        assert results == [b"image-a"] * 5
+        assert len(server.requests) == 1
+        assert not cache._inflight
+
+
+class TestReadBody:
+    """测试_read_body的长度校验与大小限制。"""
+
+    @staticmethod
+    def read(monkeypatch, body: bytes, headers: dict) -> bytes:
+        """通过模拟服务器返回指定响应，并用_read_body读取响应体。"""
+        async def handler(request):
+            return httpx.Response(200, content=body, headers=headers)
+
+        async def scenario():
+            client = image_loader._get_http_client()
+            async with client.stream("GET", "http://example.com/file") as response:
+                return await _read_body(response)
+
+        return run_with_server(monkeypatch, handler, scenario)
+
+    def test_reads_body_as_bytes(self, monkeypatch):
+        """测试按Content-Length读取的响应体以bytes类型返回。"""
+        data = self.read(monkeypatch, b"payload", {})
+
+        assert data == b"payload"
+        assert type(data) is bytes
+
+    def test_invalid_content_length_falls_back_to_streaming(self, monkeypatch):
+        """测试Content-Length无效时逐块读取完整响应体。"""
+        for value in ("abc", "-5"):
+            assert self.read(monkeypatch, b"payload", {"Content-Length": value}) == b"payload"
+
+    def test_rejects_declared_length_over_limit(self, monkeypatch):
+        """测试声明长度超过max_file_size时拒绝下载。"""
+        monkeypatch.setattr(get_settings(), "max_file_size", 4)
+
+        with pytest.raises(ImageProcessingError, match="超过上限"):
+            self.read(monkeypatch, b"payload", {})
+
+    def test_rejects_streamed_body_over_limit(self, monkeypatch):
+        """测试未声明长度但实际读取超过max_file_size时中止下载。"""
+        monkeypatch.setattr(get_settings(), "max_file_size", 4)
+
+        with pytest.raises(ImageProcessingError, match="超过上限"):
+            self.read(monkeypatch, b"payload", {"Content-Encoding": "identity"})